@@ -1,25 +1,28 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from api.core import settings
 from api.core import database
 from fastapi.middleware.cors import CORSMiddleware
+from api.core.vk_oauth import vk_oauth_service
 
 # Import routes
 from api.routes import user, community, post, comment
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await database.init_db()
+    await database.check_db()
+    await database.warm_up_pool()
     yield
+    await vk_oauth_service.close()
+    await database.close_redis()
 
-app = FastAPI(lifespan=lifespan)
-
-origins = ["*"]
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=origins,
+    allow_origins=settings.CORS_ALLOW_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -31,8 +34,9 @@ app.include_router(community.router)
 app.include_router(post.router)
 app.include_router(comment.router)
 
-# Serve uploaded files
-app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+# Serve uploaded files (in production nginx/CDN should serve /uploads/ instead)
+if settings.SERVE_UPLOADS:
+    app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 
 @app.get("/")
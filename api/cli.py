@@ -0,0 +1,39 @@
+import argparse
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def _alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+
+def migrate(revision: str = "head"):
+    """Apply database migrations up to the given revision."""
+    command.upgrade(_alembic_config(), revision)
+
+
+def stamp(revision: str = "head"):
+    """Mark an existing database (created before migrations) as up to date."""
+    command.stamp(_alembic_config(), revision)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m api.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name in ("migrate", "stamp"):
+        subparser = subparsers.add_parser(name)
+        subparser.add_argument("revision", nargs="?", default="head")
+
+    args = parser.parse_args()
+    if args.command == "migrate":
+        migrate(args.revision)
+    else:
+        stamp(args.revision)
+
+
+if __name__ == "__main__":
+    main()
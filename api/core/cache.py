@@ -0,0 +1,105 @@
+import logging
+from functools import wraps
+from typing import Any
+
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+
+from api.core.database import redis_client
+from api.core.responses import dump_rows
+
+
+def _version_key(namespace: str) -> str:
+    return f"{namespace}:ver"
+
+
+async def _get_version(namespace: str) -> bytes:
+    return await redis_client.get(_version_key(namespace)) or b"0"
+
+
+def cached(namespace: str, ttl: int, schema: Any):
+    """Cache-aside decorator for CRUD reads.
+
+    The ORM result is converted to `schema` and stored as JSON under a key
+    built from the namespace version and the call arguments (the session is
+    skipped). The wrapped function always returns `schema` instances.
+    Redis errors are logged and the call falls through to the database.
+    """
+    adapter = TypeAdapter(schema)
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(session, *args, **kwargs):
+            if redis_client is None:
+                return adapter.validate_python(await func(session, *args, **kwargs), from_attributes=True)
+
+            key = None
+            try:
+                version = await _get_version(namespace)
+                key = f"{namespace}:{version.decode()}:{func.__name__}:{args}:{sorted(kwargs.items())}"
+                raw = await redis_client.get(key)
+                if raw is not None:
+                    return adapter.validate_json(raw)
+            except RedisError as e:
+                logging.warning(f"Cache read failed for {namespace}: {e}")
+
+            result = adapter.validate_python(await func(session, *args, **kwargs), from_attributes=True)
+
+            if key is not None:
+                try:
+                    await redis_client.set(key, adapter.dump_json(result), ex=ttl)
+                except RedisError as e:
+                    logging.warning(f"Cache write failed for {namespace}: {e}")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def cached_json(namespace: str, ttl: int):
+    """Cache-aside decorator for reads served as JSON without any schema.
+
+    The wrapped function returns plain rows (dicts/lists); the wrapper always
+    returns them rendered with dump_rows, so a cache hit is sent as stored
+    without being parsed. Keys and versioning are the same as for `cached`.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(session, *args, **kwargs):
+            if redis_client is None:
+                return dump_rows(await func(session, *args, **kwargs))
+
+            key = None
+            try:
+                version = await _get_version(namespace)
+                key = f"{namespace}:{version.decode()}:{func.__name__}:{args}:{sorted(kwargs.items())}"
+                raw = await redis_client.get(key)
+                if raw is not None:
+                    return raw
+            except RedisError as e:
+                logging.warning(f"Cache read failed for {namespace}: {e}")
+
+            result = dump_rows(await func(session, *args, **kwargs))
+
+            if key is not None:
+                try:
+                    await redis_client.set(key, result, ex=ttl)
+                except RedisError as e:
+                    logging.warning(f"Cache write failed for {namespace}: {e}")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate(*namespaces: str) -> None:
+    """Invalidate every cached entry of the namespaces by bumping their version."""
+    if redis_client is None:
+        return
+    try:
+        for namespace in namespaces:
+            await redis_client.incr(_version_key(namespace))
+    except RedisError as e:
+        logging.warning(f"Cache invalidation failed for {namespaces}: {e}")
@@ -1,20 +1,67 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from typing import AsyncGenerator
-from sqlalchemy.orm import sessionmaker
-from api.core.settings import DATABASE_URL
-from api.core.models.base import Base
+from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+import redis.asyncio as aioredis
+from api.core.settings import (
+    DATABASE_URL, SQL_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_USE_NULL_POOL, REDIS_URL,
+    DB_QUERY_CACHE_SIZE, DB_PREPARED_STATEMENT_CACHE_SIZE
+)
 
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
-async_session_maker = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False)
+if DB_USE_NULL_POOL:
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=SQL_ECHO,
+        poolclass=NullPool,
+        query_cache_size=DB_QUERY_CACHE_SIZE,
+        # PgBouncer in transaction mode cannot keep server-side prepared statements
+        connect_args={"prepared_statement_cache_size": 0},
+    )
+else:
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=SQL_ECHO,
+        # Statements are compiled once per shape and prepared once per connection
+        query_cache_size=DB_QUERY_CACHE_SIZE,
+        connect_args={"prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE},
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE,
+        # Reuse the most recently returned connection so idle ones can expire
+        pool_use_lifo=True,
+    )
+async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+redis_client = aioredis.from_url(REDIS_URL) if REDIS_URL else None
 
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+
+async def check_db():
+    """Fail fast if the database is unreachable (schema is managed by Alembic)."""
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def warm_up_pool():
+    """Open `pool_size` connections up front so first requests don't pay for connecting."""
+    if DB_USE_NULL_POOL:
+        return
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(DB_POOL_SIZE)))
+
+
+async def close_redis():
+    if redis_client is not None:
+        await redis_client.aclose()
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        yield session
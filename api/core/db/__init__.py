@@ -5,24 +5,26 @@ from .comment_crud import *
 
 __all__ = [
     # user_crud
-    "get_user_by_id", "get_user_by_email", "get_users", "create_user", 
+    "get_user_by_id", "get_user_core", "get_user_by_email", "get_users", "create_user", 
     "update_current_user", "delete_user", "authenticate_user", 
     "change_user_password", "get_all_skills", "add_skill_to_user", 
     "remove_skill_from_user", "get_user_skills", "get_user_by_vk_id",
-    "update_user_vk_info", "create_user_from_vk", "update_user_profile_photo",
-    "delete_user_profile_photo", "get_or_create_skill",
+    "update_user_vk_info", "update_vk_user_profile", "link_vk_to_user_by_email", "create_user_from_vk", "update_user_profile_photo",
+    "delete_user_profile_photo", "get_or_create_skill", "get_or_create_skills",
+    "get_user_upload_urls",
     
     # community_crud
     "get_community_by_id", "get_communities", "get_user_communities",
     "get_owned_communities", "create_community", "update_community",
     "delete_community", "join_community", "leave_community", "add_moderator",
-    "remove_moderator", "is_community_owner", "is_community_moderator",
-    "is_community_member", "update_community_avatar", "delete_community_avatar",
+    "remove_moderator", "is_community_owner", "is_community_moderator", "get_community_role",
+    "is_community_member", "get_moderator_candidate_status",
+    "update_community_avatar", "delete_community_avatar",
     
     # post_crud
-    "get_post_by_id", "get_posts", "get_user_posts", "get_community_posts",
+    "get_post_by_id", "get_post_read", "get_posts", "get_user_posts", "get_community_posts",
     "create_post", "update_post", "delete_post", "like_post", "unlike_post",
-    "get_post_likes", "add_photos_to_post", "remove_photo_from_post",
+    "get_post_like_count", "get_post_likes", "add_photos_to_post", "remove_photo_from_post",
     
     # comment_crud
     "get_comment_by_id", "get_post_comments", "get_user_comments",
@@ -1,144 +1,176 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, insert, update, delete, and_, literal
 from typing import List, Optional
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from api.core.models import Comment, Post, User
-from api.core.schemas import CommentCreate, CommentUpdate
-
-
-async def get_comment_by_id(session: AsyncSession, comment_id: int) -> Optional[Comment]:
+from api.core.schemas import CommentCreate, CommentUpdate, CommentTree
+from api.core.cache import cached_json, invalidate
+from api.core.settings import COMMENTS_CACHE_TTL
+from api.core.db.utils import row_exists, clamp_limit
+
+
+# Columns of a CommentTree node; comment trees are built from plain rows
+COMMENT_COLUMNS = (
+    Comment.id, Comment.author_id, Comment.post_id, Comment.parent_comment_id,
+    Comment.text, Comment.created_at, Comment.updated_at,
+)
+
+
+async def get_comment_by_id(session: AsyncSession, comment_id: int) -> Optional[CommentTree]:
+    """Get a comment with its whole reply subtree."""
+    comments = await _get_comment_trees(session, Comment.id == comment_id)
+    return comments[0] if comments else None
+
+
+async def _get_comment_trees(
+    session: AsyncSession, *roots, newest_first: bool = False, skip: int = 0, limit: Optional[int] = None
+) -> List[CommentTree]:
+    """Load the matching root comments with all their descendants in one query."""
+    if limit is not None:
+        order = (Comment.created_at.desc(), Comment.id.desc()) if newest_first else (Comment.created_at, Comment.id)
+        roots = (Comment.id.in_(
+            select(Comment.id).where(*roots).order_by(*order).offset(skip).limit(clamp_limit(limit))
+        ),)
+    tree = (
+        select(Comment.id, literal(True).label("is_root"))
+        .where(*roots)
+        .cte("comment_tree", recursive=True)
+    )
+    tree = tree.union_all(
+        select(Comment.id, literal(False)).where(Comment.parent_comment_id == tree.c.id)
+    )
     result = await session.execute(
-        select(Comment)
-        .where(Comment.id == comment_id)
-        .options(
-            selectinload(Comment.author),
-            selectinload(Comment.post),
-            selectinload(Comment.parent_comment),
-            selectinload(Comment.replies),
-        )
+        select(*COMMENT_COLUMNS, tree.c.is_root)
+        .join(tree, tree.c.id == Comment.id)
+        .order_by(Comment.created_at.asc(), Comment.id.asc())
     )
-    return result.scalar_one_or_none()
-
 
-async def get_post_comments(session: AsyncSession, post_id: int) -> List[Comment]:
-    """Get top-level comments for a post (without parent)."""
-    result = await session.execute(
-        select(Comment)
-        .where(
-            and_(
-                Comment.post_id == post_id,
-                Comment.parent_comment_id == None
-            )
-        )
-        .options(
-            selectinload(Comment.author),
-            selectinload(Comment.replies).selectinload(Comment.author),
-        )
-        .order_by(Comment.created_at.asc())
+    # A comment can be reached both as a root and as a descendant
+    comments = {}
+    root_ids = set()
+    for row in result.mappings():
+        node = dict(row, replies=[])
+        is_root = node.pop("is_root")
+        comments[node["id"]] = node
+        if is_root:
+            root_ids.add(node["id"])
+
+    # Rows are in creation order, so every replies list comes out ordered too
+    for node in comments.values():
+        parent = comments.get(node["parent_comment_id"])
+        if parent is not None:
+            parent["replies"].append(node)
+
+    roots = [node for node in comments.values() if node["id"] in root_ids]
+    if newest_first:
+        roots.reverse()
+    return roots
+
+
+@cached_json("comments", ttl=COMMENTS_CACHE_TTL)
+async def get_post_comments(session: AsyncSession, post_id: int) -> bytes:
+    """Get top-level comments for a post (without parent), rendered as JSON."""
+    return await _get_comment_trees(
+        session, Comment.post_id == post_id, Comment.parent_comment_id == None
     )
-    return result.scalars().all()
 
 
-async def get_user_comments(session: AsyncSession, user_id: int) -> List[Comment]:
-    result = await session.execute(
-        select(Comment)
-        .where(Comment.author_id == user_id)
-        .options(
-            selectinload(Comment.author),
-            selectinload(Comment.post),
-            selectinload(Comment.parent_comment),
-            selectinload(Comment.replies).selectinload(Comment.author),
-        )
-        .order_by(Comment.created_at.desc())
+async def get_user_comments(session: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[CommentTree]:
+    return await _get_comment_trees(
+        session, Comment.author_id == user_id, newest_first=True, skip=skip, limit=limit
     )
-    return result.scalars().all()
 
 
-async def get_comment_replies(session: AsyncSession, comment_id: int) -> List[Comment]:
+async def get_comment_replies(session: AsyncSession, comment_id: int) -> List[CommentTree]:
     """Get replies to a specific comment."""
-    result = await session.execute(
-        select(Comment)
-        .where(Comment.parent_comment_id == comment_id)
-        .options(
-            selectinload(Comment.author),
-            selectinload(Comment.replies).selectinload(Comment.author),
-        )
-        .order_by(Comment.created_at.asc())
-    )
-    return result.scalars().all()
+    return await _get_comment_trees(session, Comment.parent_comment_id == comment_id)
 
 
 async def create_comment(session: AsyncSession, comment_in: CommentCreate, author_id: int) -> Comment:
     """Create a new comment."""
     # Verify post exists
-    result = await session.execute(
-        select(Post).where(Post.id == comment_in.post_id)
-    )
-    post = result.scalar_one_or_none()
-    if not post:
+    if not await row_exists(session, select(Post.id).where(Post.id == comment_in.post_id)):
         raise ValueError("Post not found")
 
     # If it's a reply, verify parent comment exists and belongs to the same post
     if comment_in.parent_comment_id is not None:
-        result = await session.execute(
-            select(Comment).where(
+        parent_exists = await row_exists(
+            session,
+            select(Comment.id).where(
                 and_(
                     Comment.id == comment_in.parent_comment_id,
                     Comment.post_id == comment_in.post_id
                 )
             )
         )
-        parent_comment = result.scalar_one_or_none()
-        if not parent_comment:
+        if not parent_exists:
             raise ValueError("Parent comment not found or doesn't belong to this post")
 
-    db_comment = Comment(
-        **comment_in.model_dump(exclude_none=True),
-        author_id=author_id
+    # INSERT ... RETURNING hands back the full row without a unit-of-work flush
+    db_comment = await session.scalar(
+        insert(Comment)
+        .values(**comment_in.model_dump(exclude_none=True), author_id=author_id)
+        .returning(Comment)
     )
-
-    session.add(db_comment)
     await session.commit()
-    await session.refresh(db_comment)
+    await invalidate("comments", "posts")
+    # A new comment has no replies yet
+    set_committed_value(db_comment, "replies", [])
     return db_comment
 
 
-async def update_comment(session: AsyncSession, comment_id: int, comment_in: CommentUpdate, user_id: int) -> Optional[Comment]:
+async def update_comment(session: AsyncSession, comment_id: int, comment_in: CommentUpdate, user_id: int) -> Optional[CommentTree]:
     """Update comment information."""
-    db_comment = await get_comment_by_id(session, comment_id)
-    if not db_comment or db_comment.author_id != user_id:
-        return None
-
-    # Update comment fields
+    # Update comment fields; the author predicate doubles as the permission check
     update_data = comment_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_comment, field, value)
+    if not update_data:
+        if not await is_comment_author(session, comment_id, user_id):
+            return None
+        return await get_comment_by_id(session, comment_id)
+
+    result = await session.execute(
+        update(Comment)
+        .where(and_(Comment.id == comment_id, Comment.author_id == user_id))
+        .values(**update_data)
+        .returning(Comment.id)
+    )
+    if result.scalar_one_or_none() is None:
+        return None
 
     await session.commit()
-    await session.refresh(db_comment)
-    return db_comment
+    await invalidate("comments")
+    return await get_comment_by_id(session, comment_id)
 
 
 async def delete_comment(session: AsyncSession, comment_id: int, user_id: int) -> bool:
-    """Delete a comment."""
-    db_comment = await get_comment_by_id(session, comment_id)
-    if not db_comment or db_comment.author_id != user_id:
-        return False
-    
-    await session.delete(db_comment)
+    """Delete a comment together with its whole reply subtree."""
+    # The root row carries the authorization predicate: if the user is not
+    # the author the CTE is empty and nothing gets deleted.
+    subtree = (
+        select(Comment.id)
+        .where(and_(Comment.id == comment_id, Comment.author_id == user_id))
+        .cte("comment_subtree", recursive=True)
+    )
+    subtree = subtree.union_all(
+        select(Comment.id).where(Comment.parent_comment_id == subtree.c.id)
+    )
+    result = await session.execute(
+        delete(Comment).where(Comment.id.in_(select(subtree.c.id)))
+    )
     await session.commit()
-    return True
+    await invalidate("comments", "posts")
+    return result.rowcount > 0
 
 
 async def is_comment_author(session: AsyncSession, comment_id: int, user_id: int) -> bool:
     """Check if user is the author of the comment."""
-    result = await session.execute(
-        select(Comment).where(
+    return await row_exists(
+        session,
+        select(Comment.id).where(
             and_(
                 Comment.id == comment_id,
                 Comment.author_id == user_id
             )
         )
-    )
-    return result.scalar_one_or_none() is not None
\ No newline at end of file
+    )
\ No newline at end of file
@@ -1,205 +1,194 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from typing import List, Optional
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, update, delete, and_, or_, func, case
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import selectinload, with_expression
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 
-from api.core.models import Community, User, UserCommunity, CommunityModerator, CommunitySkill, Skill
+from api.core.models import Community, User, UserCommunity, CommunityModerator, CommunitySkill, Skill, Post
 from api.core.schemas import CommunityCreate, CommunityUpdate
-from api.core.db.user_crud import get_or_create_skill
+from api.core.db.user_crud import get_or_create_skills
+from api.core.db.utils import row_exists, clamp_limit, insert_returning_id
+from api.core.cache import invalidate
+
+
+def _select_communities_with_counts():
+    """Select communities with member/moderator counts computed in SQL."""
+    member_count = (
+        select(func.count(UserCommunity.user_id))
+        .where(UserCommunity.community_id == Community.id)
+        .correlate(Community)
+        .scalar_subquery()
+    )
+    moderator_count = (
+        select(func.count(CommunityModerator.user_id))
+        .where(CommunityModerator.community_id == Community.id)
+        .correlate(Community)
+        .scalar_subquery()
+    )
+    return (
+        select(Community)
+        .options(
+            with_expression(Community.member_count, member_count),
+            with_expression(Community.moderator_count, moderator_count),
+            # CommunityRead only needs owner_id, so the owner row is not loaded
+            selectinload(Community.skills),
+        )
+        # Communities already in the identity map only get the counts on refresh
+        .execution_options(populate_existing=True)
+    )
 
 
 async def get_community_by_id(session: AsyncSession, community_id: int) -> Optional[Community]:
     result = await session.execute(
-        select(Community)
+        _select_communities_with_counts()
         .where(Community.id == community_id)
-        .options(
-            selectinload(Community.owner),
-            selectinload(Community.members),
-            selectinload(Community.moderators),
-            selectinload(Community.skills),
-            selectinload(Community.posts),
-        )
     )
-    community = result.scalar_one_or_none()
-    if community:
-        # populate derived counts for serialization
-        community.member_count = len(community.members or [])
-        community.moderator_count = len(community.moderators or [])
-    return community
+    return result.scalar_one_or_none()
+
+
+async def _get_owner_id(session: AsyncSession, community_id: int) -> Optional[int]:
+    """Fetch only the community owner id (None if the community does not exist)."""
+    return await session.scalar(
+        select(Community.owner_id).where(Community.id == community_id)
+    )
 
 
 async def get_communities(session: AsyncSession, skip: int = 0, limit: int = 100) -> List[Community]:
     result = await session.execute(
-        select(Community)
-        .options(
-            selectinload(Community.owner),
-            selectinload(Community.members),
-            selectinload(Community.moderators),
-            selectinload(Community.skills),
-        )
+        _select_communities_with_counts()
         .offset(skip).limit(limit)
     )
-    communities = result.scalars().all()
-    for c in communities:
-        c.member_count = len(c.members or [])
-        c.moderator_count = len(c.moderators or [])
-    return communities
+    return result.scalars().all()
 
 
-async def get_user_communities(session: AsyncSession, user_id: int) -> List[Community]:
+async def get_user_communities(session: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Community]:
     result = await session.execute(
-        select(Community)
+        _select_communities_with_counts()
         .join(UserCommunity)
         .where(UserCommunity.user_id == user_id)
-        .options(
-            selectinload(Community.owner),
-            selectinload(Community.members),
-            selectinload(Community.moderators),
-            selectinload(Community.skills),
-        )
+        .order_by(Community.id)
+        .offset(skip).limit(clamp_limit(limit))
     )
-    communities = result.scalars().all()
-    for c in communities:
-        c.member_count = len(c.members or [])
-        c.moderator_count = len(c.moderators or [])
-    return communities
+    return result.scalars().all()
 
 
-async def get_owned_communities(session: AsyncSession, user_id: int) -> List[Community]:
+async def get_owned_communities(session: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Community]:
     result = await session.execute(
-        select(Community)
+        _select_communities_with_counts()
         .where(Community.owner_id == user_id)
-        .options(
-            selectinload(Community.owner),
-            selectinload(Community.members),
-            selectinload(Community.moderators),
-            selectinload(Community.skills),
-        )
+        .order_by(Community.id)
+        .offset(skip).limit(clamp_limit(limit))
     )
-    communities = result.scalars().all()
-    for c in communities:
-        c.member_count = len(c.members or [])
-        c.moderator_count = len(c.moderators or [])
-    return communities
+    return result.scalars().all()
 
 
-async def update_community_skills(session: AsyncSession, community: Community, skill_names: List[str]):
-    """Update community skills - clear existing and add new ones."""
-    # Clear existing skills
-    if community.skills:
-        community.skills.clear()
-    
-    # Add new skills
-    for skill_name in skill_names:
-        skill = await get_or_create_skill(session, skill_name)
-        community.skills.append(skill)
+async def update_community_skills(session: AsyncSession, community_id: int, skill_names: List[str]):
+    """Update community skills without triggering lazy-load on relationship."""
+    # Remove existing links directly from association table
+    await session.execute(
+        delete(CommunitySkill).where(CommunitySkill.community_id == community_id)
+    )
+
+    skills = await get_or_create_skills(session, skill_names)
+    if skills:
+        await session.execute(
+            insert(CommunitySkill).values(
+                [{"community_id": community_id, "skill_id": skill.id} for skill in skills]
+            )
+        )
 
 
 async def create_community(session: AsyncSession, community_in: CommunityCreate, owner_id: int) -> Community:
     """Create a new community."""
-    community_data = community_in.model_dump(exclude={"skills"})
-    
-    db_community = Community(
-        **community_data,
-        owner_id=owner_id
+    community_id = await insert_returning_id(
+        session, Community, {**community_in.model_dump(exclude={"skills"}), "owner_id": owner_id}
     )
 
-    session.add(db_community)
-    await session.flush()
-
     # Add owner as first member and moderator
-    user_community = UserCommunity(
-        user_id=owner_id,
-        community_id=db_community.id,
-        role="admin"
+    await session.execute(
+        insert(UserCommunity).values(user_id=owner_id, community_id=community_id, role="admin")
     )
-    session.add(user_community)
-
-    # Add owner as moderator
-    moderator = CommunityModerator(
-        user_id=owner_id,
-        community_id=db_community.id
+    await session.execute(
+        insert(CommunityModerator).values(user_id=owner_id, community_id=community_id)
     )
-    session.add(moderator)
 
     # Handle skills
     if community_in.skills:
-        await update_community_skills(session, db_community, community_in.skills)
+        await update_community_skills(session, community_id, community_in.skills)
 
     await session.commit()
-    await session.refresh(db_community)
-    return db_community
+    return await get_community_by_id(session, community_id)
 
 
 async def update_community(session: AsyncSession, community_id: int, community_in: CommunityUpdate) -> Optional[Community]:
     """Update community information."""
+    update_data = community_in.model_dump(exclude_unset=True, exclude={"skills"})
+
+    # Without skills there is no relationship to touch: update the row directly
+    if community_in.skills is None:
+        if await _get_owner_id(session, community_id) is None:
+            return None
+        if update_data:
+            await session.execute(
+                update(Community).where(Community.id == community_id).values(**update_data)
+            )
+            await session.commit()
+        return await get_community_by_id(session, community_id)
+
     db_community = await get_community_by_id(session, community_id)
     if not db_community:
         return None
 
     # Update base community fields
-    update_data = community_in.model_dump(exclude_unset=True, exclude={"skills"})
     for field, value in update_data.items():
         setattr(db_community, field, value)
 
-    # Update skills if provided
-    if community_in.skills is not None:
-        await update_community_skills(session, db_community, community_in.skills)
+    await update_community_skills(session, db_community.id, community_in.skills)
 
     await session.commit()
-    await session.refresh(db_community)
-    return db_community
+    return await get_community_by_id(session, community_id)
 
 
 async def delete_community(session: AsyncSession, community_id: int) -> bool:
     """Delete a community."""
-    db_community = await get_community_by_id(session, community_id)
-    if not db_community:
-        return False
-    await session.delete(db_community)
+    # Clear association rows and detach posts (what the ORM cascade used to
+    # do) without loading the member/moderator collections.
+    for association in (UserCommunity, CommunityModerator, CommunitySkill):
+        await session.execute(
+            delete(association).where(association.community_id == community_id)
+        )
+    await session.execute(
+        update(Post).where(Post.community_id == community_id).values(community_id=None)
+    )
+    result = await session.execute(
+        delete(Community).where(Community.id == community_id)
+    )
     await session.commit()
-    return True
+    await invalidate("posts")
+    return result.rowcount > 0
 
 
 async def join_community(session: AsyncSession, community_id: int, user_id: int) -> bool:
     """Add user to community."""
-    # Ensure community exists to avoid FK violation
-    exists_result = await session.execute(
-        select(Community.id).where(Community.id == community_id)
-    )
-    if exists_result.scalar_one_or_none() is None:
-        return False
-
-    # Check if user is already a member
-    result = await session.execute(
-        select(UserCommunity)
-        .where(
-            and_(
-                UserCommunity.user_id == user_id,
-                UserCommunity.community_id == community_id
-            )
+    # Existing membership is a no-op; a missing community fails the FK
+    try:
+        await session.execute(
+            pg_insert(UserCommunity)
+            .values(user_id=user_id, community_id=community_id, role="member")
+            .on_conflict_do_nothing(index_elements=["user_id", "community_id"])
         )
-    )
-    existing_membership = result.scalar_one_or_none()
-    
-    if existing_membership:
-        return True  # Already a member
-
-    # Add user to community
-    user_community = UserCommunity(
-        user_id=user_id,
-        community_id=community_id,
-        role="member"
-    )
-    session.add(user_community)
-    await session.commit()
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        return False
     return True
 
 
 async def leave_community(session: AsyncSession, community_id: int, user_id: int) -> bool:
     """Remove user from community."""
     result = await session.execute(
-        select(UserCommunity)
+        delete(UserCommunity)
         .where(
             and_(
                 UserCommunity.user_id == user_id,
@@ -207,17 +196,12 @@ async def leave_community(session: AsyncSession, community_id: int, user_id: int
             )
         )
     )
-    membership = result.scalar_one_or_none()
-    
-    if not membership:
+    if result.rowcount == 0:
         return False
 
-    # Remove user from community
-    await session.delete(membership)
-    
     # Also remove from moderators if they were a moderator
-    result = await session.execute(
-        select(CommunityModerator)
+    await session.execute(
+        delete(CommunityModerator)
         .where(
             and_(
                 CommunityModerator.user_id == user_id,
@@ -225,42 +209,40 @@ async def leave_community(session: AsyncSession, community_id: int, user_id: int
             )
         )
     )
-    moderator = result.scalar_one_or_none()
-    if moderator:
-        await session.delete(moderator)
-    
+
     await session.commit()
     return True
 
 
-async def add_moderator(session: AsyncSession, community_id: int, user_id: int, owner_id: int) -> bool:
-    """Add moderator to community (only owner can do this)."""
-    # Verify the requester is the owner
-    community = await get_community_by_id(session, community_id)
-    if not community or community.owner_id != owner_id:
-        return False
-
-    # Check if user is already a moderator
-    result = await session.execute(
-        select(CommunityModerator)
+async def get_moderator_candidate_status(session: AsyncSession, community_id: int, user_id: int) -> Tuple[bool, bool]:
+    """Return (user exists, user is a community member) in one round trip."""
+    user_exists = select(User.id).where(User.id == user_id).exists()
+    is_member = (
+        select(UserCommunity.user_id)
         .where(
             and_(
-                CommunityModerator.user_id == user_id,
-                CommunityModerator.community_id == community_id
+                UserCommunity.community_id == community_id,
+                UserCommunity.user_id == user_id
             )
         )
+        .exists()
     )
-    existing_moderator = result.scalar_one_or_none()
-    
-    if existing_moderator:
-        return True  # Already a moderator
-
-    # Add user as moderator
-    moderator = CommunityModerator(
-        user_id=user_id,
-        community_id=community_id
+    row = (await session.execute(select(user_exists, is_member))).one()
+    return bool(row[0]), bool(row[1])
+
+
+async def add_moderator(session: AsyncSession, community_id: int, user_id: int, owner_id: int) -> bool:
+    """Add moderator to community (only owner can do this)."""
+    # Verify the requester is the owner
+    if await _get_owner_id(session, community_id) != owner_id:
+        return False
+
+    # Add user as moderator (no-op if already a moderator)
+    await session.execute(
+        pg_insert(CommunityModerator)
+        .values(user_id=user_id, community_id=community_id)
+        .on_conflict_do_nothing(index_elements=["user_id", "community_id"])
     )
-    session.add(moderator)
     await session.commit()
     return True
 
@@ -268,13 +250,12 @@ async def add_moderator(session: AsyncSession, community_id: int, user_id: int,
 async def remove_moderator(session: AsyncSession, community_id: int, user_id: int, owner_id: int) -> bool:
     """Remove moderator from community (only owner can do this)."""
     # Verify the requester is the owner
-    community = await get_community_by_id(session, community_id)
-    if not community or community.owner_id != owner_id:
+    if await _get_owner_id(session, community_id) != owner_id:
         return False
 
-    # Find and remove moderator
+    # Remove moderator
     result = await session.execute(
-        select(CommunityModerator)
+        delete(CommunityModerator)
         .where(
             and_(
                 CommunityModerator.user_id == user_id,
@@ -282,20 +263,15 @@ async def remove_moderator(session: AsyncSession, community_id: int, user_id: in
             )
         )
     )
-    moderator = result.scalar_one_or_none()
-    
-    if not moderator:
-        return False
-
-    await session.delete(moderator)
     await session.commit()
-    return True
+    return result.rowcount > 0
 
 
 async def is_community_owner(session: AsyncSession, community_id: int, user_id: int) -> bool:
     """Check if user is the owner of the community."""
-    result = await session.execute(
-        select(Community)
+    return await row_exists(
+        session,
+        select(Community.id)
         .where(
             and_(
                 Community.id == community_id,
@@ -303,13 +279,13 @@ async def is_community_owner(session: AsyncSession, community_id: int, user_id:
             )
         )
     )
-    return result.scalar_one_or_none() is not None
 
 
 async def is_community_moderator(session: AsyncSession, community_id: int, user_id: int) -> bool:
     """Check if user is a moderator of the community."""
-    result = await session.execute(
-        select(CommunityModerator)
+    return await row_exists(
+        session,
+        select(CommunityModerator.community_id)
         .where(
             and_(
                 CommunityModerator.community_id == community_id,
@@ -317,13 +293,36 @@ async def is_community_moderator(session: AsyncSession, community_id: int, user_
             )
         )
     )
-    return result.scalar_one_or_none() is not None
+
+
+async def get_community_role(session: AsyncSession, community_id: int, user_id: int) -> Optional[str]:
+    """Return "owner", "moderator" or None for the user in the community, in one query."""
+    is_moderator = (
+        select(CommunityModerator.user_id)
+        .where(
+            and_(
+                CommunityModerator.community_id == Community.id,
+                CommunityModerator.user_id == user_id
+            )
+        )
+        .exists()
+    )
+    return await session.scalar(
+        select(
+            case(
+                (Community.owner_id == user_id, "owner"),
+                (is_moderator, "moderator"),
+            )
+        )
+        .where(Community.id == community_id)
+    )
 
 
 async def is_community_member(session: AsyncSession, community_id: int, user_id: int) -> bool:
     """Check if user is a member of the community."""
-    result = await session.execute(
-        select(UserCommunity)
+    return await row_exists(
+        session,
+        select(UserCommunity.community_id)
         .where(
             and_(
                 UserCommunity.community_id == community_id,
@@ -331,28 +330,27 @@ async def is_community_member(session: AsyncSession, community_id: int, user_id:
             )
         )
     )
-    return result.scalar_one_or_none() is not None
 
 
 async def update_community_avatar(session: AsyncSession, community_id: int, avatar_url: str) -> Optional[Community]:
     """Update community avatar."""
-    db_community = await get_community_by_id(session, community_id)
-    if not db_community:
+    if await _get_owner_id(session, community_id) is None:
         return None
-    
-    db_community.avatar_url = avatar_url
+
+    await session.execute(
+        update(Community).where(Community.id == community_id).values(avatar_url=avatar_url)
+    )
     await session.commit()
-    await session.refresh(db_community)
-    return db_community
+    return await get_community_by_id(session, community_id)
 
 
 async def delete_community_avatar(session: AsyncSession, community_id: int) -> Optional[Community]:
     """Delete community avatar."""
-    db_community = await get_community_by_id(session, community_id)
-    if not db_community:
+    if await _get_owner_id(session, community_id) is None:
         return None
-    
-    db_community.avatar_url = None
+
+    await session.execute(
+        update(Community).where(Community.id == community_id).values(avatar_url=None)
+    )
     await session.commit()
-    await session.refresh(db_community)
-    return db_community
\ No newline at end of file
+    return await get_community_by_id(session, community_id)
\ No newline at end of file
@@ -1,56 +1,85 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, insert, update, delete, and_, func
 from typing import List, Optional
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, with_expression, load_only
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+
+from api.core.models import Post, PostPhoto, PostSkill, Like, User, Community, Comment
+from api.core.schemas import PostCreate, PostUpdate, PostRead, build_post_read, post_read_dict
+from api.core.cache import cached, cached_json, invalidate
+from api.core.settings import POSTS_CACHE_TTL, POST_CACHE_TTL
+from api.core.db.user_crud import get_or_create_skills, USER_READ_COLUMNS, USER_READ_LOAD
+from api.core.db.utils import row_exists, clamp_limit, insert_returning_id
+
+
+def _select_posts_with_counts():
+    """Select posts with like/comment counts computed in SQL."""
+    like_count = (
+        select(func.count(Like.user_id))
+        .where(Like.post_id == Post.id)
+        .correlate(Post)
+        .scalar_subquery()
+    )
+    comment_count = (
+        select(func.count(Comment.id))
+        .where(Comment.post_id == Post.id)
+        .correlate(Post)
+        .scalar_subquery()
+    )
+    return (
+        select(Post)
+        .options(
+            with_expression(Post.like_count, like_count),
+            with_expression(Post.comment_count, comment_count),
+        )
+        # Posts already in the identity map only get the counts on refresh
+        .execution_options(populate_existing=True)
+    )
 
-from api.core.models import Post, PostPhoto, Like, User, Community
-from api.core.schemas import PostCreate, PostUpdate
-from api.core.db.user_crud import get_or_create_skill
+
+def _list_options():
+    """Loader options: only the relationships PostRead serializes."""
+    return (
+        selectinload(Post.skills),
+        selectinload(Post.photos).load_only(PostPhoto.id, PostPhoto.photo_url),
+    )
 
 
 async def get_post_by_id(session: AsyncSession, post_id: int) -> Optional[Post]:
     result = await session.execute(
-        select(Post)
+        _select_posts_with_counts()
         .where(Post.id == post_id)
-        .options(
-            selectinload(Post.author),
-            selectinload(Post.community),
-            selectinload(Post.skills),
-            selectinload(Post.photos),
-            selectinload(Post.likes),
-            selectinload(Post.comments),
-        )
+        .options(*_list_options())
     )
     return result.scalar_one_or_none()
 
 
-async def get_posts(session: AsyncSession, skip: int = 0, limit: int = 100) -> List[Post]:
+@cached("posts", ttl=POST_CACHE_TTL, schema=Optional[PostRead])
+async def get_post_read(session: AsyncSession, post_id: int) -> Optional[PostRead]:
+    """Cached read-only variant of get_post_by_id for the post detail endpoint."""
+    post = await get_post_by_id(session, post_id)
+    return build_post_read(post) if post else None
+
+
+@cached_json("posts", ttl=POSTS_CACHE_TTL)
+async def get_posts(session: AsyncSession, skip: int = 0, limit: int = 100) -> bytes:
+    """Get the newest posts, rendered as JSON."""
     result = await session.execute(
-        select(Post)
-        .options(
-            selectinload(Post.author),
-            selectinload(Post.community),
-            selectinload(Post.skills),
-            selectinload(Post.photos),
-            selectinload(Post.likes),
-        )
+        _select_posts_with_counts()
+        .options(*_list_options())
         .offset(skip).limit(limit)
         .order_by(Post.created_at.desc())
     )
-    return result.scalars().all()
+    return [post_read_dict(post) for post in result.scalars()]
 
 
-async def get_user_posts(session: AsyncSession, user_id: int) -> List[Post]:
+async def get_user_posts(session: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Post]:
     result = await session.execute(
-        select(Post)
+        _select_posts_with_counts()
         .where(Post.author_id == user_id)
-        .options(
-            selectinload(Post.author),
-            selectinload(Post.community),
-            selectinload(Post.skills),
-            selectinload(Post.photos),
-            selectinload(Post.likes),
-        )
+        .options(*_list_options())
+        .offset(skip).limit(clamp_limit(limit))
         .order_by(Post.created_at.desc())
     )
     return result.scalars().all()
@@ -58,191 +87,183 @@ async def get_user_posts(session: AsyncSession, user_id: int) -> List[Post]:
 
 async def get_community_posts(session: AsyncSession, community_id: int, skip: int = 0, limit: int = 100) -> List[Post]:
     result = await session.execute(
-        select(Post)
+        _select_posts_with_counts()
         .where(Post.community_id == community_id)
-        .options(
-            selectinload(Post.author),
-            selectinload(Post.community),
-            selectinload(Post.skills),
-            selectinload(Post.photos),
-            selectinload(Post.likes),
-        )
+        .options(*_list_options())
         .offset(skip).limit(limit)
         .order_by(Post.created_at.desc())
     )
     return result.scalars().all()
 
 
-async def update_post_skills(session: AsyncSession, post: Post, skill_names: List[str]):
-    """Update post skills - clear existing and add new ones."""
-    # Clear existing skills
-    if post.skills:
-        post.skills.clear()
-    
-    # Add new skills
-    for skill_name in skill_names:
-        skill = await get_or_create_skill(session, skill_name)
-        post.skills.append(skill)
+async def update_post_skills(session: AsyncSession, post_id: int, skill_names: List[str]):
+    """Update post skills without triggering lazy-load on relationship."""
+    # Remove existing links directly from association table
+    await session.execute(
+        delete(PostSkill).where(PostSkill.post_id == post_id)
+    )
+
+    skills = await get_or_create_skills(session, skill_names)
+    if skills:
+        await session.execute(
+            insert(PostSkill).values([{"post_id": post_id, "skill_id": skill.id} for skill in skills])
+        )
 
 
 async def add_photos_to_post(session: AsyncSession, post_id: int, photo_urls: List[str], user_id: int) -> Optional[Post]:
     """Add photos to post."""
-    post = await get_post_by_id(session, post_id)
-    if not post or post.author_id != user_id:
+    if not await is_post_author(session, post_id, user_id):
         return None
-    
-    for photo_url in photo_urls:
-        photo = PostPhoto(post_id=post_id, photo_url=photo_url)
-        session.add(photo)
-    
+
+    if photo_urls:
+        await session.execute(
+            insert(PostPhoto).values([{"post_id": post_id, "photo_url": photo_url} for photo_url in photo_urls])
+        )
+
     await session.commit()
-    await session.refresh(post)
-    return post
+    await invalidate("posts")
+    return await get_post_by_id(session, post_id)
 
 
 async def remove_photo_from_post(session: AsyncSession, post_id: int, photo_id: int, user_id: int) -> bool:
     """Remove photo from post."""
-    post = await get_post_by_id(session, post_id)
-    if not post or post.author_id != user_id:
-        return False
-    
     result = await session.execute(
-        select(PostPhoto).where(
+        delete(PostPhoto).where(
             and_(
                 PostPhoto.id == photo_id,
-                PostPhoto.post_id == post_id
+                PostPhoto.post_id == post_id,
+                select(Post.id).where(
+                    and_(
+                        Post.id == post_id,
+                        Post.author_id == user_id
+                    )
+                ).exists()
             )
         )
     )
-    photo = result.scalar_one_or_none()
-    
-    if not photo:
-        return False
-    
-    await session.delete(photo)
     await session.commit()
-    return True
+    await invalidate("posts")
+    return result.rowcount > 0
 
 
 async def create_post(session: AsyncSession, post_in: PostCreate, author_id: int) -> Post:
     """Create a new post."""
-    post_data = post_in.model_dump(exclude={"skills", "photo_urls"})
-    
-    db_post = Post(
-        **post_data,
-        author_id=author_id
+    post_id = await insert_returning_id(
+        session, Post, {**post_in.model_dump(exclude={"skills", "photo_urls"}), "author_id": author_id}
     )
 
-    session.add(db_post)
-    await session.flush()
-
     # Handle skills
     if post_in.skills:
-        await update_post_skills(session, db_post, post_in.skills)
+        await update_post_skills(session, post_id, post_in.skills)
 
     # Handle photos
     if post_in.photo_urls:
-        for photo_url in post_in.photo_urls:
-            photo = PostPhoto(post_id=db_post.id, photo_url=photo_url)
-            session.add(photo)
+        await session.execute(
+            insert(PostPhoto).values(
+                [{"post_id": post_id, "photo_url": photo_url} for photo_url in post_in.photo_urls]
+            )
+        )
 
     await session.commit()
-    await session.refresh(db_post)
-    return db_post
+    await invalidate("posts")
+    return await get_post_by_id(session, post_id)
 
 
 async def update_post(session: AsyncSession, post_id: int, post_in: PostUpdate, user_id: int) -> Optional[Post]:
     """Update post information."""
-    db_post = await get_post_by_id(session, post_id)
-    if not db_post or db_post.author_id != user_id:
-        return None
-
-    # Update base post fields
+    # Update base post fields; the author predicate doubles as the permission check
     update_data = post_in.model_dump(exclude_unset=True, exclude={"skills"})
-    for field, value in update_data.items():
-        setattr(db_post, field, value)
+    if update_data:
+        result = await session.execute(
+            update(Post)
+            .where(and_(Post.id == post_id, Post.author_id == user_id))
+            .values(**update_data)
+            .returning(Post.id)
+        )
+        if result.scalar_one_or_none() is None:
+            return None
+    elif not await is_post_author(session, post_id, user_id):
+        return None
 
     # Update skills if provided
     if post_in.skills is not None:
-        await update_post_skills(session, db_post, post_in.skills)
+        await update_post_skills(session, post_id, post_in.skills)
 
     await session.commit()
-    await session.refresh(db_post)
-    return db_post
+    await invalidate("posts")
+    return await get_post_by_id(session, post_id)
 
 
 async def delete_post(session: AsyncSession, post_id: int, user_id: int) -> bool:
-    """Delete a post."""
-    db_post = await get_post_by_id(session, post_id)
-    if not db_post or db_post.author_id != user_id:
+    """Delete a post together with its comments, likes, photos and skill links."""
+    if not await is_post_author(session, post_id, user_id):
         return False
-    
-    await session.delete(db_post)
+
+    # Comments, likes, photos and skill links go via ON DELETE CASCADE
+    await session.execute(delete(Post).where(Post.id == post_id))
     await session.commit()
+    await invalidate("posts", "comments")
     return True
 
 
 async def like_post(session: AsyncSession, post_id: int, user_id: int) -> bool:
     """Like a post."""
-    # Check if already liked
-    result = await session.execute(
-        select(Like).where(
-            and_(
-                Like.post_id == post_id,
-                Like.user_id == user_id
-            )
+    # Repeated like is a no-op; a missing post fails the FK
+    try:
+        await session.execute(
+            pg_insert(Like)
+            .values(post_id=post_id, user_id=user_id)
+            .on_conflict_do_nothing(index_elements=["user_id", "post_id"])
         )
-    )
-    existing_like = result.scalar_one_or_none()
-    
-    if existing_like:
-        return True  # Already liked
-
-    # Add like
-    like = Like(post_id=post_id, user_id=user_id)
-    session.add(like)
-    await session.commit()
+        await session.commit()
+        await invalidate("posts")
+    except IntegrityError:
+        await session.rollback()
+        return False
     return True
 
 
 async def unlike_post(session: AsyncSession, post_id: int, user_id: int) -> bool:
     """Unlike a post."""
     result = await session.execute(
-        select(Like).where(
+        delete(Like).where(
             and_(
                 Like.post_id == post_id,
                 Like.user_id == user_id
             )
         )
     )
-    like = result.scalar_one_or_none()
-    
-    if not like:
-        return False
-
-    await session.delete(like)
     await session.commit()
-    return True
+    await invalidate("posts")
+    return result.rowcount > 0
+
+
+async def get_post_like_count(session: AsyncSession, post_id: int) -> int:
+    """Count the likes of a post without loading the post."""
+    return await session.scalar(
+        select(func.count()).select_from(Like).where(Like.post_id == post_id)
+    )
 
 
 async def get_post_likes(session: AsyncSession, post_id: int) -> List[User]:
-    """Get users who liked a post."""
+    """Get users who liked a post, loaded for UserRead."""
     result = await session.execute(
         select(User)
         .join(Like)
         .where(Like.post_id == post_id)
+        .options(load_only(*USER_READ_COLUMNS), *(selectinload(rel) for rel in USER_READ_LOAD))
     )
     return result.scalars().all()
 
 
 async def is_post_author(session: AsyncSession, post_id: int, user_id: int) -> bool:
     """Check if user is the author of the post."""
-    result = await session.execute(
-        select(Post).where(
+    return await row_exists(
+        session,
+        select(Post.id).where(
             and_(
                 Post.id == post_id,
                 Post.author_id == user_id
             )
         )
-    )
-    return result.scalar_one_or_none() is not None
\ No newline at end of file
+    )
\ No newline at end of file
@@ -1,39 +1,57 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import Row, select, insert, update, delete, and_
 from typing import List, Optional
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, load_only
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 
-from api.core.models import User, Skill, UserSkill
+from api.core.models import User, Skill, UserSkill, Post, PostPhoto
+from api.core.cache import invalidate
+from api.core.db.utils import row_exists
 from api.core.schemas import UserCreate, UserUpdate
-from api.core.security import get_password_hash, verify_password
+from api.core.security import (
+    get_password_hash_async, verify_password_async, verify_and_update_password_async, DUMMY_PASSWORD_HASH
+)
 import string
 import secrets
 
 
-async def get_user_by_id(session: AsyncSession, user_id: int) -> Optional[User]:
+# Columns and relationships serialized by UserRead
+USER_READ_COLUMNS = (
+    User.id, User.email, User.first_name, User.last_name, User.patronymic, User.description,
+    User.contact, User.place_of_job, User.place_of_study, User.profile_photo, User.vk_avatar,
+    User.created_at,
+)
+USER_READ_LOAD = (User.skills, User.communities)
+
+
+def _user_load_options(load):
+    """Selectin-load only the relationships the caller asked for."""
+    return [selectinload(relationship) for relationship in load]
+
+
+async def get_user_core(session: AsyncSession, user_id: int) -> Optional[User]:
+    """Load only the user row (enough for authentication and ownership checks)."""
+    # Served from the identity map without SQL when the user is already loaded
+    return await session.get(User, user_id)
+
+
+async def get_user_by_id(session: AsyncSession, user_id: int, load=USER_READ_LOAD) -> Optional[User]:
     result = await session.execute(
         select(User)
         .where(User.id == user_id)
-        .options(
-            selectinload(User.skills),
-            selectinload(User.communities),
-            selectinload(User.owned_communities),
-            selectinload(User.moderated_communities),
-        )
+        .options(*_user_load_options(load))
+        .execution_options(populate_existing=True)
     )
     return result.scalar_one_or_none()
 
 
-async def get_user_by_email(session: AsyncSession, email: str) -> Optional[User]:
+async def get_user_by_email(session: AsyncSession, email: str, load=USER_READ_LOAD) -> Optional[User]:
     result = await session.execute(
         select(User)
         .where(User.email == email)
-        .options(
-            selectinload(User.skills),
-            selectinload(User.communities),
-            selectinload(User.owned_communities),
-            selectinload(User.moderated_communities),
-        )
+        .options(*_user_load_options(load))
+        .execution_options(populate_existing=True)
     )
     return result.scalar_one_or_none()
 
@@ -41,47 +59,51 @@ async def get_user_by_email(session: AsyncSession, email: str) -> Optional[User]
 async def get_users(session: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
     result = await session.execute(
         select(User)
-        .options(
-            selectinload(User.skills),
-            selectinload(User.communities),
-            selectinload(User.owned_communities),
-            selectinload(User.moderated_communities),
-        )
+        # Skip the password hash and vk_id nobody on the list path reads
+        .options(load_only(*USER_READ_COLUMNS), *_user_load_options(USER_READ_LOAD))
         .offset(skip).limit(limit)
     )
     return result.scalars().all()
 
 
 async def get_or_create_skill(session: AsyncSession, skill_name: str) -> Skill:
-    """Get existing skill or create new one."""
-    result = await session.execute(
-        select(Skill).where(Skill.name == skill_name)
+    """Get existing skill or create new one with a single idempotent upsert."""
+    stmt = pg_insert(Skill).values(name=skill_name)
+    # The no-op DO UPDATE makes RETURNING yield the row even when it already exists
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"], set_={"name": stmt.excluded.name}
+    ).returning(Skill)
+    return await session.scalar(stmt)
+
+
+async def get_or_create_skills(session: AsyncSession, skill_names: List[str]) -> List[Skill]:
+    """Get or create several skills with one upsert and one SELECT."""
+    names = list(dict.fromkeys(skill_names))
+    if not names:
+        return []
+
+    await session.execute(
+        pg_insert(Skill)
+        .values([{"name": name} for name in names])
+        .on_conflict_do_nothing(index_elements=["name"])
     )
-    skill = result.scalar_one_or_none()
-    
-    if not skill:
-        skill = Skill(name=skill_name)
-        session.add(skill)
-        await session.flush()
-    
-    return skill
+    result = await session.execute(select(Skill).where(Skill.name.in_(names)))
+    skills_by_name = {skill.name: skill for skill in result.scalars()}
+    return [skills_by_name[name] for name in names]
 
 
-async def update_user_skills(session: AsyncSession, user: User, skill_names: List[str]):
+async def update_user_skills(session: AsyncSession, user_id: int, skill_names: List[str]):
     """Update user skills without triggering lazy-load on relationship."""
     # Remove existing links directly from association table
     await session.execute(
-        delete(UserSkill).where(UserSkill.user_id == user.id)
+        delete(UserSkill).where(UserSkill.user_id == user_id)
     )
 
-    if not skill_names:
-        return
-
-    # Insert new links directly
-    for skill_name in skill_names:
-        skill = await get_or_create_skill(session, skill_name)
-        link = UserSkill(user_id=user.id, skill_id=skill.id)
-        session.add(link)
+    skills = await get_or_create_skills(session, skill_names)
+    if skills:
+        await session.execute(
+            insert(UserSkill).values([{"user_id": user_id, "skill_id": skill.id} for skill in skills])
+        )
 
 
 async def create_user(session: AsyncSession, user_in: UserCreate) -> User:
@@ -91,7 +113,7 @@ async def create_user(session: AsyncSession, user_in: UserCreate) -> User:
     # Create user with hashed password
     db_user = User(
         **user_data,
-        password=get_password_hash(user_in.password)
+        password=await get_password_hash_async(user_in.password)
     )
 
     session.add(db_user)
@@ -99,190 +121,249 @@ async def create_user(session: AsyncSession, user_in: UserCreate) -> User:
 
     # Handle skills
     if user_in.skills:
-        await update_user_skills(session, db_user, user_in.skills)
+        await update_user_skills(session, db_user.id, user_in.skills)
 
     await session.commit()
-    await session.refresh(db_user)
-    return db_user
+    return await get_user_by_id(session, db_user.id, load=USER_READ_LOAD)
+
+
+async def _update_user_columns(session: AsyncSession, user_id: int, **values) -> bool:
+    """Update user columns with a single UPDATE; False if the user does not exist."""
+    result = await session.execute(
+        update(User).where(User.id == user_id).values(**values).returning(User.id)
+    )
+    return result.scalar_one_or_none() is not None
 
 
 async def update_current_user(session: AsyncSession, user_id: int, user_in: UserUpdate) -> Optional[User]:
     """Update current user with profile data."""
-    db_user = await get_user_by_id(session, user_id)
-    if not db_user:
-        return None
-
     # Update base user fields
     update_data = user_in.model_dump(exclude_unset=True, exclude={"skills"})
-    for field, value in update_data.items():
-        setattr(db_user, field, value)
+    if update_data:
+        if not await _update_user_columns(session, user_id, **update_data):
+            return None
+    elif not await row_exists(session, select(User.id).where(User.id == user_id)):
+        return None
 
     # Update skills if provided
     if user_in.skills is not None:
-        await update_user_skills(session, db_user, user_in.skills)
+        await update_user_skills(session, user_id, user_in.skills)
 
     await session.commit()
-    await session.refresh(db_user)
-    return db_user
+    return await get_user_by_id(session, user_id, load=USER_READ_LOAD)
 
 
 async def update_user_profile_photo(session: AsyncSession, user_id: int, profile_photo_url: str) -> Optional[User]:
     """Update user profile photo."""
-    db_user = await get_user_by_id(session, user_id)
-    if not db_user:
+    if not await _update_user_columns(session, user_id, profile_photo=profile_photo_url):
         return None
-    
-    db_user.profile_photo = profile_photo_url
     await session.commit()
-    await session.refresh(db_user)
-    return db_user
+    return await get_user_by_id(session, user_id, load=USER_READ_LOAD)
 
 
 async def delete_user_profile_photo(session: AsyncSession, user_id: int) -> Optional[User]:
     """Delete user profile photo."""
-    db_user = await get_user_by_id(session, user_id)
-    if not db_user:
+    if not await _update_user_columns(session, user_id, profile_photo=None):
         return None
-    
-    db_user.profile_photo = None
     await session.commit()
-    await session.refresh(db_user)
-    return db_user
+    return await get_user_by_id(session, user_id, load=USER_READ_LOAD)
+
+
+async def get_user_upload_urls(session: AsyncSession, user_id: int) -> List[str]:
+    """Uploaded files owned by the user: profile photo and photos of their posts."""
+    result = await session.execute(
+        select(User.profile_photo).where(and_(User.id == user_id, User.profile_photo.is_not(None)))
+        .union_all(
+            select(PostPhoto.photo_url).join(Post, Post.id == PostPhoto.post_id).where(Post.author_id == user_id)
+        )
+    )
+    return list(result.scalars().all())
 
 
 async def delete_user(session: AsyncSession, user_id: int) -> bool:
-    db_user = await get_user_by_id(session, user_id)
-    if not db_user:
+    """Delete a user; posts, comments, likes and memberships go with it via ON DELETE CASCADE."""
+    try:
+        result = await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
+    except IntegrityError:
+        # Still owns communities
+        await session.rollback()
         return False
-    await session.delete(db_user)
-    await session.commit()
-    return True
+    await invalidate("posts", "comments")
+    return result.rowcount > 0
 
 
 async def authenticate_user(session: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate user by email and password."""
-    user = await get_user_by_email(session, email)
+    user = await get_user_by_email(session, email, load=())
     if not user:
+        await verify_password_async(password, DUMMY_PASSWORD_HASH)
         return None
-    if not verify_password(password, user.password):
+
+    valid, new_hash = await verify_and_update_password_async(password, user.password)
+    if not valid:
         return None
+    if new_hash:
+        # Rehash with the current scheme parameters on successful login
+        user.password = new_hash
+        await session.commit()
     return user
 
 
 async def change_user_password(session: AsyncSession, user_id: int, current_password: str, new_password: str) -> bool:
     """Change user password."""
-    user = await get_user_by_id(session, user_id)
-    if not user:
+    password_hash = await session.scalar(select(User.password).where(User.id == user_id))
+    if password_hash is None:
         return False
-    
-    if not verify_password(current_password, user.password):
+
+    if not await verify_password_async(current_password, password_hash):
         return False
-    
-    user.password = get_password_hash(new_password)
+
+    await _update_user_columns(session, user_id, password=await get_password_hash_async(new_password))
     await session.commit()
     return True
 
 
 # --- Skills CRUD Operations ---
-async def get_all_skills(session: AsyncSession) -> List[Skill]:
-    """Get all available skills."""
-    result = await session.execute(select(Skill))
-    return result.scalars().all()
+async def get_all_skills(session: AsyncSession) -> List[str]:
+    """Get the names of all available skills."""
+    result = await session.execute(select(Skill.name))
+    return list(result.scalars().all())
 
 
 async def add_skill_to_user(session: AsyncSession, user_id: int, skill_name: str) -> bool:
     """Add a skill to user."""
-    user = await get_user_by_id(session, user_id)
-    if not user:
-        return False
-    
     skill = await get_or_create_skill(session, skill_name)
-    
-    # Check if skill already exists for user
-    if skill not in user.skills:
-        user.skills.append(skill)
+
+    # Repeated add is a no-op; a missing user fails the FK
+    try:
+        await session.execute(
+            pg_insert(UserSkill)
+            .values(user_id=user_id, skill_id=skill.id)
+            .on_conflict_do_nothing(index_elements=["user_id", "skill_id"])
+        )
         await session.commit()
-    
+    except IntegrityError:
+        await session.rollback()
+        return False
     return True
 
 
 async def remove_skill_from_user(session: AsyncSession, user_id: int, skill_name: str) -> bool:
     """Remove a skill from user."""
-    user = await get_user_by_id(session, user_id)
-    if not user:
-        return False
-    
     result = await session.execute(
-        select(Skill).where(Skill.name == skill_name)
+        delete(UserSkill).where(
+            and_(
+                UserSkill.user_id == user_id,
+                UserSkill.skill_id == select(Skill.id).where(Skill.name == skill_name).scalar_subquery()
+            )
+        )
     )
-    skill = result.scalar_one_or_none()
-    
-    if skill and skill in user.skills:
-        user.skills.remove(skill)
-        await session.commit()
-        return True
-    
-    return False
+    await session.commit()
+    return result.rowcount > 0
 
 
 async def get_user_skills(session: AsyncSession, user_id: int) -> List[str]:
     """Get skills for a user."""
-    user = await get_user_by_id(session, user_id)
-    if not user:
-        return []
-    
-    return [skill.name for skill in user.skills]
+    result = await session.execute(
+        select(Skill.name)
+        .join(UserSkill, UserSkill.skill_id == Skill.id)
+        .where(UserSkill.user_id == user_id)
+    )
+    return list(result.scalars().all())
 
 
 # --- VK OAuth CRUD Operations ---
-async def get_user_by_vk_id(session: AsyncSession, vk_id: int) -> Optional[User]:
+async def get_user_by_vk_id(session: AsyncSession, vk_id: int, load=USER_READ_LOAD) -> Optional[User]:
     """Get user by VK ID"""
     result = await session.execute(
         select(User)
         .where(User.vk_id == vk_id)
-        .options(
-            selectinload(User.skills),
-            selectinload(User.communities),
-            selectinload(User.owned_communities),
-            selectinload(User.moderated_communities),
-        )
+        .options(*_user_load_options(load))
+        .execution_options(populate_existing=True)
     )
     return result.scalar_one_or_none()
 
 
+async def _insert_user_if_email_free(session: AsyncSession, values: dict) -> Optional[User]:
+    """Insert a user, or return None if the email is already taken."""
+    return await session.scalar(
+        pg_insert(User)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(User)
+    )
+
+
+VK_EMAIL_ATTEMPTS = 5
+
+
 async def create_user_from_vk(session: AsyncSession, vk_user_info) -> User:
     """Create a new user from VK OAuth data"""
     # Generate a random password for OAuth users
     alphabet = string.ascii_letters + string.digits
     random_password = ''.join(secrets.choice(alphabet) for _ in range(16))
     
-    # Create email if not provided by VK
-    email = vk_user_info.email or f"vk_{vk_user_info.id}@example.com"
-    
-    # Check if email already exists
-    existing_user = await get_user_by_email(session, email)
-    if existing_user:
+    values = {
+        "email": vk_user_info.email or f"vk_{vk_user_info.id}@example.com",
+        "first_name": vk_user_info.first_name,
+        "last_name": vk_user_info.last_name,
+        "password": await get_password_hash_async(random_password),
+        "vk_id": vk_user_info.id,
+        "vk_avatar": vk_user_info.photo_200,
+    }
+
+    # No lookup beforehand: the email's unique index detects a collision
+    user = await _insert_user_if_email_free(session, values)
+    for _ in range(VK_EMAIL_ATTEMPTS):
+        if user is not None:
+            break
         # If user exists with this email, append random string
-        email = f"vk_{vk_user_info.id}_{secrets.token_hex(4)}@example.com"
-    
-    user = User(
-        email=email,
-        first_name=vk_user_info.first_name,
-        last_name=vk_user_info.last_name,
-        password=get_password_hash(random_password),
-        vk_id=vk_user_info.id,
-        vk_avatar=vk_user_info.photo_200
-    )
-    
-    session.add(user)
+        values["email"] = f"vk_{vk_user_info.id}_{secrets.token_hex(4)}@example.com"
+        user = await _insert_user_if_email_free(session, values)
+    if user is None:
+        await session.rollback()
+        raise ValueError("Could not find a free email for the VK user")
+
     await session.commit()
-    await session.refresh(user)
     return user
 
 
+async def update_vk_user_profile(session: AsyncSession, vk_id: int, vk_user_info) -> Optional[Row]:
+    """Refresh the VK profile fields of the user linked to vk_id; (id, email) or None if none is linked."""
+    result = await session.execute(
+        update(User)
+        .where(User.vk_id == vk_id)
+        .values(
+            vk_avatar=vk_user_info.photo_200,
+            first_name=vk_user_info.first_name,
+            last_name=vk_user_info.last_name,
+        )
+        .returning(User.id, User.email)
+    )
+    row = result.one_or_none()
+    if row is not None:
+        await session.commit()
+    return row
+
+
+async def link_vk_to_user_by_email(session: AsyncSession, email: str, vk_id: int, vk_avatar: Optional[str]) -> Optional[Row]:
+    """Link a VK account to the user with this email; (id, email) or None if there is no such user."""
+    result = await session.execute(
+        update(User)
+        .where(User.email == email)
+        .values(vk_id=vk_id, vk_avatar=vk_avatar)
+        .returning(User.id, User.email)
+    )
+    row = result.one_or_none()
+    if row is not None:
+        await session.commit()
+    return row
+
+
 async def update_user_vk_info(session: AsyncSession, user_id: int, vk_user_info) -> Optional[User]:
     """Update user's VK information"""
-    user = await get_user_by_id(session, user_id)
+    user = await get_user_by_id(session, user_id, load=())
     if not user:
         return None
     
@@ -291,5 +372,4 @@ async def update_user_vk_info(session: AsyncSession, user_id: int, vk_user_info)
     user.last_name = vk_user_info.last_name
     
     await session.commit()
-    await session.refresh(user)
     return user
\ No newline at end of file
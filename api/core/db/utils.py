@@ -0,0 +1,20 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, Select
+
+from api.core.settings import MAX_PAGE_SIZE
+
+
+async def row_exists(session: AsyncSession, stmt: Select) -> bool:
+    """Run `SELECT EXISTS(stmt)` and return the result as bool."""
+    return bool(await session.scalar(select(stmt.exists())))
+
+
+async def insert_returning_id(session: AsyncSession, model, values: dict) -> int:
+    """INSERT one row with Core (no unit of work) and return its id."""
+    table = model.__table__
+    return await session.scalar(insert(table).values(**values).returning(table.c.id))
+
+
+def clamp_limit(limit: int) -> int:
+    """Keep a requested page size within 0..MAX_PAGE_SIZE."""
+    return max(0, min(limit, MAX_PAGE_SIZE))
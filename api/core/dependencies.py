@@ -1,40 +1,43 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError
 from api.core.models import User
 from api.core.database import get_async_session
 from api.core.security import verify_token
-from api.core.db.user_crud import get_user_by_id
+from api.core.db.user_crud import get_user_core
 
 security = HTTPBearer()
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: AsyncSession = Depends(get_async_session)
 ):
+    # Resolve the user once per request, however many dependencies ask for it
+    user = getattr(request.state, "current_user", None)
+    if user is not None:
+        return user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = verify_token(credentials.credentials)
-        if payload is None:
-            raise credentials_exception
-        
-        user_id: int = payload.get("user_id")
-        if user_id is None:
-            raise credentials_exception
-            
-    except JWTError:
+    payload = verify_token(credentials.credentials)
+    if payload is None:
+        raise credentials_exception
+
+    user_id: int = payload.get("user_id")
+    if user_id is None:
         raise credentials_exception
     
-    user = await get_user_by_id(session, user_id=user_id)
+    user = await get_user_core(session, user_id=user_id)
     if user is None:
         raise credentials_exception
-        
+
+    request.state.token_payload = payload
+    request.state.current_user = user
     return user
 
 
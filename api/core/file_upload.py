@@ -1,9 +1,34 @@
 import os
-import uuid
+import contextlib
+import logging
+import secrets
+import aiofiles
+import aiofiles.os
 from fastapi import UploadFile, HTTPException
-import shutil
 from api.core.settings import UPLOAD_DIR, ALLOWED_IMAGE_TYPES, MAX_FILE_SIZE
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+IMAGE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+
+def sniff_image_type(head: bytes):
+    """Detect the image MIME type from the file signature (None if unknown)."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
 
 class FileUploadService:
     def __init__(self):
@@ -13,6 +38,8 @@ class FileUploadService:
         
         # Create upload directory if it doesn't exist
         os.makedirs(self.upload_dir, exist_ok=True)
+        # Category directories already created by this process
+        self._ensured_dirs: set[str] = set()
 
     async def upload_profile_photo(self, file: UploadFile, user_id: int) -> str:
         """Upload user profile photo"""
@@ -28,49 +55,58 @@ class FileUploadService:
 
     async def _upload_image(self, file: UploadFile, category: str, entity_id: int) -> str:
         """Generic image upload method"""
-        # Validate file type
-        if file.content_type not in self.allowed_types:
+        # Validate file type by its content, not the client-supplied content type
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        content_type = sniff_image_type(chunk)
+        if content_type not in self.allowed_types:
             raise HTTPException(
                 status_code=400, 
                 detail=f"File type not allowed. Allowed types: {', '.join(self.allowed_types)}"
             )
 
-        # Validate file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Seek back to start
-        
-        if file_size > self.max_size:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size: {self.max_size // (1024 * 1024)}MB"
-            )
-
         # Generate unique filename
-        file_extension = file.filename.split('.')[-1]
-        filename = f"{category}_{entity_id}_{uuid.uuid4().hex}.{file_extension}"
-        file_path = os.path.join(self.upload_dir, category, filename)
+        filename = f"{category}_{entity_id}_{secrets.token_hex(16)}.{IMAGE_EXTENSIONS[content_type]}"
+        category_dir = os.path.join(self.upload_dir, category)
+        file_path = os.path.join(category_dir, filename)
         
         # Create category directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if category not in self._ensured_dirs:
+            os.makedirs(category_dir, exist_ok=True)
+            self._ensured_dirs.add(category)
 
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save file in chunks, enforcing the size limit while streaming
+        total = 0
+        try:
+            async with aiofiles.open(file_path, "wb") as buffer:
+                while chunk:
+                    total += len(chunk)
+                    if total > self.max_size:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"File too large. Maximum size: {self.max_size // (1024 * 1024)}MB"
+                        )
+                    await buffer.write(chunk)
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                await aiofiles.os.remove(file_path)
+            raise
 
         # Return relative URL for database storage
         return f"/uploads/{category}/{filename}"
 
     async def delete_file(self, file_url: str) -> bool:
-        """Delete uploaded file"""
+        """Delete uploaded file (off the event loop); False if nothing was deleted"""
+        if not file_url.startswith('/uploads/'):
+            return False
+        file_path = os.path.join(self.upload_dir, file_url.replace('/uploads/', ''))
         try:
-            if file_url.startswith('/uploads/'):
-                file_path = os.path.join(self.upload_dir, file_url.replace('/uploads/', ''))
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    return True
+            await aiofiles.os.remove(file_path)
+            return True
+        except FileNotFoundError:
             return False
-        except Exception:
+        except OSError as e:
+            logging.warning(f"Failed to delete uploaded file {file_url}: {e}")
             return False
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -15,26 +15,36 @@ class Comment(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Comment author
-    author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    author = relationship("User", back_populates="comments", lazy="selectin")
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    author = relationship("User", back_populates="comments", lazy="raise_on_sql")
 
     # Post this comment belongs to
-    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
-    post = relationship("Post", back_populates="comments", lazy="selectin")
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+    post = relationship("Post", back_populates="comments", lazy="raise_on_sql")
 
     # Parent comment (for nested comments)
-    parent_comment_id = Column(Integer, ForeignKey("comments.id"), nullable=True)
+    parent_comment_id = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"), nullable=True, index=True)
     parent_comment = relationship(
         "Comment", 
         remote_side=[id],
         back_populates="replies",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
     
     # Replies to this comment
     replies = relationship(
         "Comment", 
         back_populates="parent_comment",
-        lazy="selectin",
-        cascade="all, delete-orphan"
+        lazy="raise_on_sql",
+        passive_deletes=True
+    )
+
+    __table_args__ = (
+        # All comments of a post (counts, deletes) in display order
+        Index("ix_comments_post_created", post_id, created_at),
+        # Top-level comments of a post in display order
+        Index(
+            "ix_comments_post_toplevel", post_id, created_at,
+            postgresql_where=parent_comment_id.is_(None),
+        ),
     )
\ No newline at end of file
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, literal
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from .base import Base
 
 
@@ -20,32 +20,36 @@ class Community(Base):
 
     # Community owner
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    owner = relationship("User", back_populates="owned_communities", lazy="selectin")
+    owner = relationship("User", back_populates="owned_communities", lazy="raise_on_sql")
 
     # Community members (many-to-many)
     members = relationship(
-        "User", secondary="user_communities", back_populates="communities", lazy="selectin"
+        "User", secondary="user_communities", back_populates="communities", lazy="raise_on_sql"
     )
     
     # Community moderators (many-to-many)
     moderators = relationship(
-        "User", secondary="community_moderators", back_populates="moderated_communities", lazy="selectin"
+        "User", secondary="community_moderators", back_populates="moderated_communities", lazy="raise_on_sql"
     )
     
     # Community skills
     skills = relationship(
-        "Skill", secondary="community_skills", back_populates="communities", lazy="selectin"
+        "Skill", secondary="community_skills", back_populates="communities", lazy="raise_on_sql"
     )
     
     # Community posts
-    posts = relationship("Post", back_populates="community", lazy="selectin")
+    posts = relationship("Post", back_populates="community", lazy="raise_on_sql")
+
+    # Counts computed by the query itself (see community_crud)
+    member_count = query_expression(default_expr=literal(0))
+    moderator_count = query_expression(default_expr=literal(0))
 
 
 class UserCommunity(Base):
     __tablename__ = "user_communities"
 
     user_id = Column(
-        Integer(), ForeignKey("users.id"), primary_key=True, nullable=False
+        Integer(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, nullable=False
     )
     community_id = Column(
         Integer(), ForeignKey("communities.id"), primary_key=True, nullable=False
@@ -53,12 +57,15 @@ class UserCommunity(Base):
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
     role = Column(String(20), nullable=False, default="member")  # member, moderator, admin
 
+    # The (user_id, community_id) primary key covers the user side; this one serves member lookups
+    __table_args__ = (Index("ix_user_communities_community_user", community_id, user_id, unique=True),)
+
 
 class CommunityModerator(Base):
     __tablename__ = "community_moderators"
 
     user_id = Column(
-        Integer(), ForeignKey("users.id"), primary_key=True, nullable=False
+        Integer(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, nullable=False
     )
     community_id = Column(
         Integer(), ForeignKey("communities.id"), primary_key=True, nullable=False
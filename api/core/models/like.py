@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -8,12 +8,15 @@ class Like(Base):
     __tablename__ = "likes"
 
     user_id = Column(
-        Integer(), ForeignKey("users.id"), primary_key=True, nullable=False
+        Integer(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, nullable=False
     )
     post_id = Column(
-        Integer(), ForeignKey("posts.id"), primary_key=True, nullable=False
+        Integer(), ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True, nullable=False
     )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    user = relationship("User", back_populates="likes", lazy="selectin")
-    post = relationship("Post", back_populates="likes", lazy="selectin")
\ No newline at end of file
+    user = relationship("User", back_populates="likes", lazy="raise_on_sql")
+    post = relationship("Post", back_populates="likes", lazy="raise_on_sql")
+
+    # The (user_id, post_id) primary key covers the user side; this one serves per-post lookups
+    __table_args__ = (Index("ix_likes_post_user", post_id, user_id, unique=True),)
\ No newline at end of file
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, String, Index, literal
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from .base import Base
 
 
@@ -15,26 +15,36 @@ class Post(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Post author (can be user or community)
-    author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    author = relationship("User", back_populates="posts", lazy="selectin")
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    author = relationship("User", back_populates="posts", lazy="raise_on_sql")
 
     # Community (if this is a community post)
     community_id = Column(Integer, ForeignKey("communities.id"), nullable=True)
-    community = relationship("Community", back_populates="posts", lazy="selectin")
+    community = relationship("Community", back_populates="posts", lazy="raise_on_sql")
 
     # Post skills
     skills = relationship(
-        "Skill", secondary="post_skills", back_populates="posts", lazy="selectin"
+        "Skill", secondary="post_skills", back_populates="posts", lazy="raise_on_sql"
     )
 
     # Post photos
-    photos = relationship("PostPhoto", back_populates="post", lazy="selectin", cascade="all, delete-orphan")
+    photos = relationship("PostPhoto", back_populates="post", lazy="raise_on_sql", passive_deletes=True)
 
     # Post likes
-    likes = relationship("Like", back_populates="post", lazy="selectin", cascade="all, delete-orphan")
+    likes = relationship("Like", back_populates="post", lazy="raise_on_sql", passive_deletes=True)
     
     # Post comments
-    comments = relationship("Comment", back_populates="post", lazy="selectin", cascade="all, delete-orphan")
+    comments = relationship("Comment", back_populates="post", lazy="raise_on_sql", passive_deletes=True)
+
+    # Counts computed by the query itself (see post_crud)
+    like_count = query_expression(default_expr=literal(0))
+    comment_count = query_expression(default_expr=literal(0))
+
+    __table_args__ = (
+        # User and community feeds, newest first
+        Index("ix_posts_author_created", author_id, created_at.desc()),
+        Index("ix_posts_community_created", community_id, created_at.desc()),
+    )
 
 
 class PostPhoto(Base):
@@ -43,18 +53,18 @@ class PostPhoto(Base):
     id = Column(
         Integer(), primary_key=True, index=True, nullable=False, autoincrement=True
     )
-    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False, index=True)
     photo_url = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    post = relationship("Post", back_populates="photos", lazy="selectin")
+    post = relationship("Post", back_populates="photos", lazy="raise_on_sql")
 
 
 class PostSkill(Base):
     __tablename__ = "post_skills"
 
     post_id = Column(
-        Integer(), ForeignKey("posts.id"), primary_key=True, nullable=False
+        Integer(), ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True, nullable=False
     )
     skill_id = Column(
         Integer(), ForeignKey("skills.id"), primary_key=True, nullable=False
@@ -13,13 +13,13 @@ class Skill(Base):
 
     # Relationships
     users = relationship(
-        "User", secondary="user_skills", back_populates="skills", lazy="selectin"
+        "User", secondary="user_skills", back_populates="skills", lazy="raise_on_sql"
     )
     
     communities = relationship(
-        "Community", secondary="community_skills", back_populates="skills", lazy="selectin"
+        "Community", secondary="community_skills", back_populates="skills", lazy="raise_on_sql"
     )
     
     posts = relationship(
-        "Post", secondary="post_skills", back_populates="skills", lazy="selectin"
+        "Post", secondary="post_skills", back_populates="skills", lazy="raise_on_sql"
     )
\ No newline at end of file
@@ -30,35 +30,35 @@ class User(Base):
 
     # Direct relationships
     skills = relationship(
-        "Skill", secondary="user_skills", back_populates="users", lazy="selectin"
+        "Skill", secondary="user_skills", back_populates="users", lazy="raise_on_sql"
     )
     communities = relationship(
-        "Community", secondary="user_communities", back_populates="members", lazy="selectin"
+        "Community", secondary="user_communities", back_populates="members", lazy="raise_on_sql"
     )
     
     # Communities owned by this user
-    owned_communities = relationship("Community", back_populates="owner", lazy="selectin")
+    owned_communities = relationship("Community", back_populates="owner", lazy="raise_on_sql")
     
     # Communities where user is moderator
     moderated_communities = relationship(
-        "Community", secondary="community_moderators", back_populates="moderators", lazy="selectin"
+        "Community", secondary="community_moderators", back_populates="moderators", lazy="raise_on_sql"
     )
     
     # Posts created by user
-    posts = relationship("Post", back_populates="author", lazy="selectin")
+    posts = relationship("Post", back_populates="author", lazy="raise_on_sql")
     
     # Comments created by user
-    comments = relationship("Comment", back_populates="author", lazy="selectin")
+    comments = relationship("Comment", back_populates="author", lazy="raise_on_sql")
     
     # Likes given by user
-    likes = relationship("Like", back_populates="user", lazy="selectin")
+    likes = relationship("Like", back_populates="user", lazy="raise_on_sql")
 
 
 class UserSkill(Base):
     __tablename__ = "user_skills"
 
     user_id = Column(
-        Integer(), ForeignKey("users.id"), primary_key=True, nullable=False
+        Integer(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, nullable=False
     )
     skill_id = Column(
         Integer(), ForeignKey("skills.id"), primary_key=True, nullable=False
@@ -0,0 +1,27 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+
+
+def dump_rows(content: Any) -> bytes:
+    """Render plain dicts built from trusted rows the way RowsJSONResponse does."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+class RowsJSONResponse(ORJSONResponse):
+    """Serialize plain dicts built from trusted rows straight with orjson.
+
+    Returning it from an endpoint skips response_model validation and
+    serialization; the response_model is then only used for the docs.
+    Datetimes are rendered like pydantic does (UTC as "Z").
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_rows(content)
+
+
+class RenderedJSONResponse(Response):
+    """Send a body that is already JSON (e.g. from cached_json) as is."""
+
+    media_type = "application/json"
@@ -1,15 +1,15 @@
 from .auth import Token, TokenData, UserLogin, UserChangePassword, VKAuthRequest, VKAuthResponse, VKUserInfo
-from .user import UserBase, UserCreate, UserUpdate, UserRead, UserProfilePhotoUpdate
-from .community import CommunityBase, CommunityCreate, CommunityUpdate, CommunityRead, CommunityModeratorAdd, CommunityModeratorRemove
+from .user import UserBase, UserCreate, UserUpdate, UserRead, UserProfilePhotoUpdate, build_user_read, user_read_dict
+from .community import CommunityBase, CommunityCreate, CommunityUpdate, CommunityRead, CommunityModeratorAdd, CommunityModeratorRemove, build_community_read, community_read_dict
 from .skill import SkillBase, SkillCreate, SkillRead
-from .post import PostBase, PostCreate, PostUpdate, PostRead, LikeResponse
-from .comment import CommentBase, CommentCreate, CommentUpdate, CommentRead
+from .post import PostBase, PostCreate, PostUpdate, PostRead, LikeResponse, build_post_read, post_read_dict
+from .comment import CommentBase, CommentCreate, CommentUpdate, CommentFlat, CommentRead, CommentTree, build_comment_read
 
 __all__ = [
     "Token", "TokenData", "UserLogin", "UserChangePassword", "VKAuthRequest", "VKAuthResponse", "VKUserInfo",
-    "UserBase", "UserCreate", "UserUpdate", "UserRead", "UserProfilePhotoUpdate",
-    "CommunityBase", "CommunityCreate", "CommunityUpdate", "CommunityRead", "CommunityModeratorAdd", "CommunityModeratorRemove",
+    "UserBase", "UserCreate", "UserUpdate", "UserRead", "UserProfilePhotoUpdate", "build_user_read", "user_read_dict",
+    "CommunityBase", "CommunityCreate", "CommunityUpdate", "CommunityRead", "CommunityModeratorAdd", "CommunityModeratorRemove", "build_community_read", "community_read_dict",
     "SkillBase", "SkillCreate", "SkillRead",
-    "PostBase", "PostCreate", "PostUpdate", "PostRead", "LikeResponse",
-    "CommentBase", "CommentCreate", "CommentUpdate", "CommentRead"
+    "PostBase", "PostCreate", "PostUpdate", "PostRead", "LikeResponse", "build_post_read", "post_read_dict",
+    "CommentBase", "CommentCreate", "CommentUpdate", "CommentFlat", "CommentRead", "CommentTree", "build_comment_read"
 ]
\ No newline at end of file
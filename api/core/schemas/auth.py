@@ -1,25 +1,29 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ConfigDict
 from typing import Optional
 
 
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
+    model_config = ConfigDict(defer_build=True)
 
 
 class UserChangePassword(BaseModel):
     current_password: str
     new_password: str
+    model_config = ConfigDict(defer_build=True)
 
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    model_config = ConfigDict(defer_build=True)
 
 
 class TokenData(BaseModel):
     email: Optional[str] = None
     user_id: Optional[int] = None
+    model_config = ConfigDict(defer_build=True)
 
 
 class VKUserInfo(BaseModel):
@@ -28,13 +32,16 @@ class VKUserInfo(BaseModel):
     last_name: str
     email: Optional[EmailStr] = None
     photo_200: Optional[str] = None
+    model_config = ConfigDict(defer_build=True)
 
 
 class VKAuthRequest(BaseModel):
     code: str
+    model_config = ConfigDict(defer_build=True)
 
 
 class VKAuthResponse(BaseModel):
     access_token: str
     token_type: str
-    is_new_user: bool
\ No newline at end of file
+    is_new_user: bool
+    model_config = ConfigDict(defer_build=True)
\ No newline at end of file
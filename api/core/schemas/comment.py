@@ -1,10 +1,11 @@
-from pydantic import BaseModel, ConfigDict, field_validator, field_serializer
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import Optional, List, TypedDict
 from datetime import datetime
 
 
 class CommentBase(BaseModel):
     text: str
+    model_config = ConfigDict(defer_build=True)
 
 
 class CommentCreate(CommentBase):
@@ -20,71 +21,46 @@ class CommentCreate(CommentBase):
 
 
 class CommentUpdate(BaseModel):
-    text: Optional[str] = None
+    # Omitted text stays unset (exclude_unset); null is rejected
+    text: str = None
+    model_config = ConfigDict(defer_build=True)
 
 
-class CommentRead(CommentBase):
+class CommentFlat(CommentBase):
     id: int
     author_id: int
     post_id: int
     parent_comment_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
-    replies: List['CommentRead'] = []
     model_config = ConfigDict(from_attributes=True)
 
-    @field_serializer("replies", when_used="always")
-    def _serialize_replies(self, replies):
-        if not replies:
-            return []
-        # Serialize only one nesting level to avoid lazy-loading deeper trees
-        serialized = []
-        for r in replies:
-            if isinstance(r, dict):
-                item = dict(r)
-                item["replies"] = []
-                serialized.append(item)
-            else:
-                serialized.append({
-                    "id": getattr(r, "id"),
-                    "author_id": getattr(r, "author_id"),
-                    "post_id": getattr(r, "post_id"),
-                    "parent_comment_id": getattr(r, "parent_comment_id"),
-                    "text": getattr(r, "text"),
-                    "created_at": getattr(r, "created_at"),
-                    "updated_at": getattr(r, "updated_at"),
-                    "replies": []
-                })
-        return serialized
 
-    @field_validator("replies", mode="before")
-    @classmethod
-    def _coerce_replies_before(cls, v):
-        if v is None:
-            return []
-        # Flatten to one level early to avoid triggering lazy loads
-        flat = []
-        try:
-            for r in v:
-                if isinstance(r, dict):
-                    item = dict(r)
-                    item["replies"] = []
-                    flat.append(item)
-                else:
-                    flat.append({
-                        "id": getattr(r, "id"),
-                        "author_id": getattr(r, "author_id"),
-                        "post_id": getattr(r, "post_id"),
-                        "parent_comment_id": getattr(r, "parent_comment_id"),
-                        "text": getattr(r, "text"),
-                        "created_at": getattr(r, "created_at"),
-                        "updated_at": getattr(r, "updated_at"),
-                        "replies": []
-                    })
-        except Exception:
-            return v
-        return flat
+class CommentRead(CommentFlat):
+    replies: List['CommentRead'] = []
+
+
+class CommentTree(TypedDict):
+    """A comment row with its replies nested, as built by comment_crud."""
+    id: int
+    author_id: int
+    post_id: int
+    parent_comment_id: Optional[int]
+    text: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+    replies: List['CommentTree']
 
 
-# For recursive models
-CommentRead.update_forward_refs()
\ No newline at end of file
+def build_comment_read(node: CommentTree) -> CommentRead:
+    """Build CommentRead from a CommentTree loaded by comment_crud without re-validating it."""
+    return CommentRead.model_construct(
+        id=node["id"],
+        author_id=node["author_id"],
+        post_id=node["post_id"],
+        parent_comment_id=node["parent_comment_id"],
+        text=node["text"],
+        created_at=node["created_at"],
+        updated_at=node["updated_at"],
+        replies=[build_comment_read(reply) for reply in node["replies"]],
+    )
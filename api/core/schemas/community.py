@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, field_validator, field_serializer
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
@@ -7,6 +7,7 @@ class CommunityBase(BaseModel):
     title: str
     description: Optional[str] = None
     is_official: bool = False  # Changed from is_public
+    model_config = ConfigDict(defer_build=True)
 
 
 class CommunityCreate(CommunityBase):
@@ -14,10 +15,12 @@ class CommunityCreate(CommunityBase):
 
 
 class CommunityUpdate(BaseModel):
-    title: Optional[str] = None
+    # Only description is nullable; omitted fields stay unset (exclude_unset)
+    title: str = None
     description: Optional[str] = None
-    is_official: Optional[bool] = None
-    skills: Optional[List[str]] = None
+    is_official: bool = None
+    skills: List[str] = None
+    model_config = ConfigDict(defer_build=True)
 
 
 class CommunityRead(CommunityBase):
@@ -32,24 +35,35 @@ class CommunityRead(CommunityBase):
     skills: List[str] = []
     model_config = ConfigDict(from_attributes=True)
 
-    @field_validator("skills", mode="before")
-    @classmethod
-    def _coerce_skills_before(cls, v):
-        if v is None:
-            return []
-        try:
-            return [s.name for s in v]
-        except Exception:
-            return v
 
-    @field_serializer("skills", when_used="always")
-    def _serialize_skills(self, skills):
-        return [s.name if hasattr(s, "name") else s for s in (skills or [])]
+def community_read_dict(community) -> dict:
+    """Flatten a loaded ORM community into the CommunityRead fields."""
+    return {
+        "id": community.id,
+        "owner_id": community.owner_id,
+        "title": community.title,
+        "description": community.description,
+        "is_official": community.is_official,
+        "avatar_url": community.avatar_url,
+        "cover_url": community.cover_url,
+        "created_at": community.created_at,
+        "updated_at": community.updated_at,
+        "member_count": community.member_count,
+        "moderator_count": community.moderator_count,
+        "skills": [s.name for s in community.skills],
+    }
+
+
+def build_community_read(community) -> CommunityRead:
+    """Build CommunityRead from a loaded ORM community without re-validating it."""
+    return CommunityRead.model_construct(**community_read_dict(community))
 
 
 class CommunityModeratorAdd(BaseModel):
     user_id: int
+    model_config = ConfigDict(defer_build=True)
 
 
 class CommunityModeratorRemove(BaseModel):
-    user_id: int
\ No newline at end of file
+    user_id: int
+    model_config = ConfigDict(defer_build=True)
\ No newline at end of file
@@ -1,10 +1,11 @@
-from pydantic import BaseModel, ConfigDict, field_validator, field_serializer
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
 
 class PostBase(BaseModel):
     text: str
+    model_config = ConfigDict(defer_build=True)
 
 
 class PostCreate(PostBase):
@@ -14,8 +15,10 @@ class PostCreate(PostBase):
 
 
 class PostUpdate(BaseModel):
-    text: Optional[str] = None
-    skills: Optional[List[str]] = None
+    # Omitted fields stay unset (exclude_unset); null is rejected
+    text: str = None
+    skills: List[str] = None
+    model_config = ConfigDict(defer_build=True)
 
 
 class PostRead(PostBase):
@@ -31,35 +34,30 @@ class PostRead(PostBase):
     is_liked: bool = False
     model_config = ConfigDict(from_attributes=True)
 
-    @field_validator("skills", mode="before")
-    @classmethod
-    def _coerce_skills_before(cls, v):
-        if v is None:
-            return []
-        try:
-            return [s.name for s in v]
-        except Exception:
-            return v
 
-    @field_serializer("skills", when_used="always")
-    def _serialize_skills(self, skills):
-        return [s.name if hasattr(s, "name") else s for s in (skills or [])]
+def post_read_dict(post) -> dict:
+    """Flatten a loaded ORM post (skills, photos and counts) into the PostRead fields."""
+    return {
+        "id": post.id,
+        "text": post.text,
+        "author_id": post.author_id,
+        "community_id": post.community_id,
+        "created_at": post.created_at,
+        "updated_at": post.updated_at,
+        "skills": [s.name for s in post.skills],
+        "photo_urls": [p.photo_url for p in post.photos],
+        "like_count": post.like_count,
+        "comment_count": post.comment_count,
+        "is_liked": False,
+    }
 
-    @field_validator("photo_urls", mode="before")
-    @classmethod
-    def _coerce_photos_before(cls, v):
-        if v is None:
-            return []
-        try:
-            return [p.photo_url for p in v]
-        except Exception:
-            return v
 
-    @field_serializer("photo_urls", when_used="always")
-    def _serialize_photos(self, photo_urls):
-        return [p.photo_url if hasattr(p, "photo_url") else p for p in (photo_urls or [])]
+def build_post_read(post) -> PostRead:
+    """Build PostRead from a loaded ORM post (skills, photos and counts) without re-validating it."""
+    return PostRead.model_construct(**post_read_dict(post))
 
 
 class LikeResponse(BaseModel):
     liked: bool
-    like_count: int
\ No newline at end of file
+    like_count: int
+    model_config = ConfigDict(defer_build=True)
\ No newline at end of file
@@ -3,6 +3,7 @@ from pydantic import BaseModel, ConfigDict
 
 class SkillBase(BaseModel):
     name: str
+    model_config = ConfigDict(defer_build=True)
 
 
 class SkillCreate(SkillBase):
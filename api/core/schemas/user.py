@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, ConfigDict, field_serializer, field_validator
+from pydantic import BaseModel, EmailStr, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
@@ -12,6 +12,7 @@ class UserBase(BaseModel):
     contact: Optional[str] = None  # New field
     place_of_job: Optional[str] = None  # New field
     place_of_study: Optional[str] = None  # New field
+    model_config = ConfigDict(defer_build=True)
 
 
 class UserCreate(UserBase):
@@ -20,15 +21,18 @@ class UserCreate(UserBase):
 
 
 class UserUpdate(BaseModel):
-    email: Optional[EmailStr] = None
-    first_name: Optional[str] = None
-    last_name: Optional[str] = None
+    # NOT NULL columns are not Optional: an omitted field stays unset (the
+    # update uses exclude_unset), an explicit null is rejected with 422.
+    email: EmailStr = None
+    first_name: str = None
+    last_name: str = None
     patronymic: Optional[str] = None
     description: Optional[str] = None
     contact: Optional[str] = None
     place_of_job: Optional[str] = None
     place_of_study: Optional[str] = None
-    skills: Optional[List[str]] = None
+    skills: List[str] = None
+    model_config = ConfigDict(defer_build=True)
 
 
 class UserRead(UserBase):
@@ -40,42 +44,32 @@ class UserRead(UserBase):
     communities: List[str] = []
     model_config = ConfigDict(from_attributes=True)
 
-    @field_validator("skills", mode="before")
-    @classmethod
-    def _coerce_skills_before(cls, v):
-        if v is None:
-            return []
-        try:
-            return [s.name for s in v]
-        except Exception:
-            return v
 
-    @field_validator("communities", mode="before")
-    @classmethod
-    def _coerce_communities_before(cls, v):
-        if v is None:
-            return []
-        try:
-            return [c.title for c in v]
-        except Exception:
-            return v
+def user_read_dict(user) -> dict:
+    """Flatten an ORM user loaded with USER_READ_LOAD into the UserRead fields."""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "patronymic": user.patronymic,
+        "description": user.description,
+        "contact": user.contact,
+        "place_of_job": user.place_of_job,
+        "place_of_study": user.place_of_study,
+        "created_at": user.created_at,
+        "profile_photo": user.profile_photo,
+        "vk_avatar": user.vk_avatar,
+        "skills": [s.name for s in user.skills],
+        "communities": [c.title for c in user.communities],
+    }
 
-    @field_serializer("skills", when_used="always")
-    def serialize_skills(self, skills):
-        return [s.name if hasattr(s, "name") else s for s in (skills or [])]
 
-    @field_serializer("communities", when_used="always")
-    def serialize_communities(self, communities):
-        if not communities:
-            return []
-        serialized = []
-        for item in communities:
-            if isinstance(item, str):
-                serialized.append(item)
-            else:
-                serialized.append(getattr(item, "title", str(item)))
-        return serialized
+def build_user_read(user) -> UserRead:
+    """Build UserRead from an ORM user loaded with USER_READ_LOAD, without re-validating it."""
+    return UserRead.model_construct(**user_read_dict(user))
 
 
 class UserProfilePhotoUpdate(BaseModel):
-    profile_photo: str  # URL of the uploaded photo
\ No newline at end of file
+    profile_photo: str  # URL of the uploaded photo
+    model_config = ConfigDict(defer_build=True)
\ No newline at end of file
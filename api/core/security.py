@@ -1,39 +1,91 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import secrets
+import time
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from typing import Optional
+import jwt
+from typing import Optional, Tuple
 from api.core.settings import SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified against when no user matches, so unknown emails cost as much as wrong passwords
+DUMMY_PASSWORD_HASH = pwd_context.hash(secrets.token_urlsafe(16))
+
+# bcrypt releases the GIL, so a thread pool keeps hashing off the event loop
+HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="password-hash")
+
 # JWT settings
 ALGORITHM = "HS256"
+SECRET_KEY_BYTES = SECRET_KEY.encode()
+ACCESS_TOKEN_EXPIRE = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+# Decoded payloads by token; a token is its own integrity check, so a cached
+# payload stays valid until its exp
+TOKEN_CACHE_SIZE = 4096
+_token_cache: dict = {}
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash if the stored one uses outdated parameters."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password[:72])
 
 
+async def _run_in_hash_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(HASH_POOL, func, *args)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=int(ACCESS_TOKEN_EXPIRE_MINUTES))
+        expire = datetime.utcnow() + ACCESS_TOKEN_EXPIRE
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY_BYTES, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def verify_token(token: str):
+    payload = _token_cache.get(token)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            return payload
+        _token_cache.pop(token, None)
+        return None
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
-        return None
\ No newline at end of file
+        payload = jwt.decode(token, SECRET_KEY_BYTES, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        return None
+
+    if "exp" in payload:
+        if len(_token_cache) >= TOKEN_CACHE_SIZE:
+            # Evict the oldest entry
+            _token_cache.pop(next(iter(_token_cache)))
+        _token_cache[token] = payload
+    return payload
\ No newline at end of file
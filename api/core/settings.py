@@ -8,12 +8,36 @@ DB_HOST = os.environ.get('DB_HOST')
 DB_USER = os.environ.get('DB_USER')
 DB_NAME = os.environ.get('DB_NAME')
 DB_PASS = os.environ.get('DB_PASS')
-DB_PORT = os.environ.get('DB_PORT')
-
+DB_PORT = int(os.environ.get('DB_PORT') or '5432')
+
+# Connection pool settings (pool_size + max_overflow should cover peak concurrent requests)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '20'))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '40'))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+# Behind PgBouncer (transaction pooling) let it do the pooling instead
+DB_USE_NULL_POOL = os.environ.get('DB_USE_NULL_POOL', '').strip().lower() in ('1', 'true', 'yes')
+SQL_ECHO = os.environ.get('SQL_ECHO', '').strip().lower() in ('1', 'true', 'yes')
+# Compiled SQL kept per engine and prepared statements kept per asyncpg connection
+DB_QUERY_CACHE_SIZE = int(os.environ.get('DB_QUERY_CACHE_SIZE', '1200'))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_PREPARED_STATEMENT_CACHE_SIZE', '500'))
+
+
+# Redis cache settings (cache is disabled when REDIS_URL is not set)
+REDIS_URL = os.environ.get('REDIS_URL')
+POSTS_CACHE_TTL = int(os.environ.get('POSTS_CACHE_TTL', '30'))
+POST_CACHE_TTL = int(os.environ.get('POST_CACHE_TTL', '300'))
+COMMENTS_CACHE_TTL = int(os.environ.get('COMMENTS_CACHE_TTL', '60'))
 
 # Security settings
 SECRET_KEY = os.environ.get('SECRET_KEY')
-ACCESS_TOKEN_EXPIRE_MINUTES = os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES')
+if not SECRET_KEY:
+    raise RuntimeError('SECRET_KEY must be set')
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES') or '60')
+
+# CORS settings (comma-separated list, "*" allows any origin)
+CORS_ALLOW_ORIGINS = [
+    origin.strip() for origin in os.environ.get('CORS_ALLOW_ORIGINS', '*').split(',') if origin.strip()
+]
 
 # VK OAuth settings
 VK_CLIENT_ID = os.environ.get('VK_CLIENT_ID')
@@ -23,9 +47,14 @@ VK_API_VERSION = os.environ.get('VK_API_VERSION', '5.131')
 
 # File upload settings
 UPLOAD_DIR = os.environ.get('UPLOAD_DIR', 'uploads')
+# Disable when a reverse proxy/CDN serves /uploads/ straight from UPLOAD_DIR
+SERVE_UPLOADS = os.environ.get('SERVE_UPLOADS', '1').strip().lower() in ('1', 'true', 'yes')
 ALLOWED_IMAGE_TYPES = ['image/jpeg', 'image/png', 'image/gif', 'image/webp']
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Upper bound for `limit` on per-user list endpoints
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '200'))
+
 DATABASE_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
 DATE_FORMAT = '%m/%d/%Y %H:%M UTC'
\ No newline at end of file
@@ -2,10 +2,21 @@ import httpx
 from typing import Optional, Dict, Any
 import secrets
 import base64
+import hashlib
+import hmac
 import logging
-from api.core.settings import VK_CLIENT_ID, VK_CLIENT_SECRET, VK_REDIRECT_URI, VK_API_VERSION
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+from api.core.settings import VK_CLIENT_ID, VK_CLIENT_SECRET, VK_REDIRECT_URI, VK_API_VERSION, SECRET_KEY
 from api.core.schemas.auth import VKUserInfo  # Import from auth specifically
 
+# How long an issued OAuth state stays valid
+STATE_TTL_SECONDS = 600
+# Consumed states remembered (per process) to reject replays within the TTL
+CONSUMED_STATES_MAX = 10_000
+
+
 class VKOAuthService:
     def __init__(self):
         self.client_id = VK_CLIENT_ID
@@ -14,30 +25,63 @@ class VKOAuthService:
         self.api_version = VK_API_VERSION
         self.base_url = "https://oauth.vk.com"
         self.api_url = "https://api.vk.com/method"
-        # simple in-memory state storage; for production, replace with signed state or redis
-        self._issued_states: set[str] = set()
+        # Everything but the state is fixed, so the query string is encoded once
+        self._authorize_url = f"{self.base_url}/authorize?" + urlencode({
+            "client_id": self.client_id,
+            "redirect_uri": self.redirect_uri,
+            "response_type": "code",
+            "scope": "email",
+            "v": self.api_version,
+        })
+        # Static parts of the VK requests; each call only adds its own values
+        self._access_token_url = f"{self.base_url}/access_token"
+        self._users_get_url = f"{self.api_url}/users.get"
+        self._token_params_base = {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "redirect_uri": self.redirect_uri,
+        }
+        self._user_info_params_base = {
+            "fields": "photo_200,email",
+            "v": self.api_version,
+        }
+        # OAuth state is signed rather than stored, so it survives restarts and works across workers
+        self._state_key = SECRET_KEY.encode()
+        # Consumed state -> issued at (ns), oldest consumption first
+        self._consumed_states: OrderedDict[str, int] = OrderedDict()
+        # Shared client so VK connections (and TLS sessions) are reused across logins
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                timeout=10.0,
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def get_access_token(self, code: str) -> Optional[Dict[str, Any]]:
         """Exchange authorization code for access token"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/access_token",
-                    params={
-                        "client_id": self.client_id,
-                        "client_secret": self.client_secret,
-                        "redirect_uri": self.redirect_uri,
-                        "code": code,
-                    }
-                )
-                data = response.json()
+            client = await self._get_client()
+            response = await client.get(
+                self._access_token_url,
+                params={**self._token_params_base, "code": code},
+            )
+            data = response.json()
+            
+            if "access_token" in data:
+                return data
+            else:
+                logging.error(f"VK OAuth error: {data}")
+                return None
                 
-                if "access_token" in data:
-                    return data
-                else:
-                    logging.error(f"VK OAuth error: {data}")
-                    return None
-                    
         except Exception as e:
             logging.error(f"Error getting VK access token: {e}")
             return None
@@ -45,62 +89,65 @@ class VKOAuthService:
     async def get_user_info(self, access_token: str, user_id: int) -> Optional[VKUserInfo]:
         """Get user information from VK API"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_url}/users.get",
-                    params={
-                        "user_ids": user_id,
-                        "fields": "photo_200,email",
-                        "access_token": access_token,
-                        "v": self.api_version,
-                    }
+            client = await self._get_client()
+            response = await client.get(
+                self._users_get_url,
+                params={**self._user_info_params_base, "user_ids": user_id, "access_token": access_token},
+            )
+            data = response.json()
+            
+            if "response" in data and len(data["response"]) > 0:
+                user_data = data["response"][0]
+                return VKUserInfo(
+                    id=user_data["id"],
+                    first_name=user_data["first_name"],
+                    last_name=user_data["last_name"],
+                    email=user_data.get("email"),
+                    photo_200=user_data.get("photo_200")
                 )
-                data = response.json()
+            else:
+                logging.error(f"VK API error: {data}")
+                return None
                 
-                if "response" in data and len(data["response"]) > 0:
-                    user_data = data["response"][0]
-                    return VKUserInfo(
-                        id=user_data["id"],
-                        first_name=user_data["first_name"],
-                        last_name=user_data["last_name"],
-                        email=user_data.get("email"),
-                        photo_200=user_data.get("photo_200")
-                    )
-                else:
-                    logging.error(f"VK API error: {data}")
-                    return None
-                    
         except Exception as e:
             logging.error(f"Error getting VK user info: {e}")
             return None
 
+    def _sign_state(self, payload: str) -> bytes:
+        digest = hmac.new(self._state_key, payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=")
+
     def _generate_state(self) -> str:
-        token = secrets.token_urlsafe(24)
-        # keep compact
-        state = base64.urlsafe_b64encode(token.encode()).decode().rstrip("=")
-        self._issued_states.add(state)
-        return state
+        # <issued at, ns>.<nonce>.<signature>, all URL-safe
+        payload = f"{time.time_ns()}.{secrets.token_urlsafe(12)}"
+        return f"{payload}.{self._sign_state(payload).decode()}"
 
     def validate_and_consume_state(self, state: Optional[str]) -> bool:
         if not state:
             return False
-        if state in self._issued_states:
-            self._issued_states.remove(state)
-            return True
-        return False
+        payload, _, signature = state.rpartition(".")
+        if not payload or not hmac.compare_digest(signature.encode(), self._sign_state(payload)):
+            return False
+        issued_at = int(payload.partition(".")[0])
+        now = time.time_ns()
+        if now - issued_at > STATE_TTL_SECONDS * 1_000_000_000:
+            return False
+
+        # Expired states are rejected by the TTL anyway, so forget them
+        consumed = self._consumed_states
+        while consumed and now - next(iter(consumed.values())) > STATE_TTL_SECONDS * 1_000_000_000:
+            consumed.popitem(last=False)
+        if state in consumed:
+            return False
+        consumed[state] = issued_at
+        if len(consumed) > CONSUMED_STATES_MAX:
+            consumed.popitem(last=False)
+        return True
 
     def get_authorization_url(self) -> Dict[str, str]:
         """Generate VK OAuth authorization URL with state"""
         state = self._generate_state()
-        url = (
-            f"{self.base_url}/authorize?"
-            f"client_id={self.client_id}&"
-            f"redirect_uri={self.redirect_uri}&"
-            f"response_type=code&"
-            f"scope=email&"
-            f"v={self.api_version}&"
-            f"state={state}"
-        )
+        url = f"{self._authorize_url}&{urlencode({'state': state})}"
         return {"url": url, "state": state}
 
 
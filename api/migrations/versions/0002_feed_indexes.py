@@ -0,0 +1,31 @@
+"""indexes for feeds, comments, likes and memberships
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15 22:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_comments_post_toplevel', 'comments', ['post_id', 'created_at'], unique=False, postgresql_where=sa.text('parent_comment_id IS NULL'))
+    op.create_index('ix_posts_author_created', 'posts', ['author_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_posts_community_created', 'posts', ['community_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_likes_post_user', 'likes', ['post_id', 'user_id'], unique=True)
+    op.create_index('ix_user_communities_community_user', 'user_communities', ['community_id', 'user_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_user_communities_community_user', table_name='user_communities')
+    op.drop_index('ix_likes_post_user', table_name='likes')
+    op.drop_index('ix_posts_community_created', table_name='posts')
+    op.drop_index('ix_posts_author_created', table_name='posts')
+    op.drop_index('ix_comments_post_toplevel', table_name='comments')
@@ -0,0 +1,29 @@
+"""indexes on comment and post photo foreign keys
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15 22:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_comments_post_created', 'comments', ['post_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_comments_author_id'), 'comments', ['author_id'], unique=False)
+    op.create_index(op.f('ix_comments_parent_comment_id'), 'comments', ['parent_comment_id'], unique=False)
+    op.create_index(op.f('ix_post_photos_post_id'), 'post_photos', ['post_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_post_photos_post_id'), table_name='post_photos')
+    op.drop_index(op.f('ix_comments_parent_comment_id'), table_name='comments')
+    op.drop_index(op.f('ix_comments_author_id'), table_name='comments')
+    op.drop_index('ix_comments_post_created', table_name='comments')
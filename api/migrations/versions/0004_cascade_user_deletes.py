@@ -0,0 +1,46 @@
+"""on delete cascade for user- and post-owned rows
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15 23:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, referred table); constraint names are the Postgres defaults
+CASCADE_FOREIGN_KEYS = [
+    ('user_skills', 'user_id', 'users'),
+    ('user_communities', 'user_id', 'users'),
+    ('community_moderators', 'user_id', 'users'),
+    ('posts', 'author_id', 'users'),
+    ('comments', 'author_id', 'users'),
+    ('comments', 'post_id', 'posts'),
+    ('comments', 'parent_comment_id', 'comments'),
+    ('likes', 'user_id', 'users'),
+    ('likes', 'post_id', 'posts'),
+    ('post_photos', 'post_id', 'posts'),
+    ('post_skills', 'post_id', 'posts'),
+]
+
+
+def _recreate_foreign_keys(ondelete):
+    for table, column, referred in CASCADE_FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _recreate_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _recreate_foreign_keys(None)
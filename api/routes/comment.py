@@ -6,10 +6,11 @@ from api.core.db.comment_crud import (
     create_comment, get_comment_by_id, get_post_comments, get_user_comments,
     update_comment, delete_comment, get_comment_replies
 )
-from api.core.schemas import CommentCreate, CommentUpdate, CommentRead
+from api.core.schemas import CommentCreate, CommentUpdate, CommentRead, build_comment_read
 from api.core.database import get_async_session
 from api.core.dependencies import get_current_user, get_current_active_user
 from api.core.models import User
+from api.core.responses import RowsJSONResponse, RenderedJSONResponse
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
@@ -37,18 +38,21 @@ async def read_post_comments(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Get comments for a post."""
-    comments = await get_post_comments(session, post_id)
-    return [CommentRead.model_validate(c) for c in comments]
+    # Already rendered JSON (see the cache decorator)
+    return RenderedJSONResponse(await get_post_comments(session, post_id))
 
 
 @router.get("/my", response_model=List[CommentRead])
 async def read_my_comments(
+    skip: int = 0,
+    limit: int = 100,
     current_user: User = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_async_session)
 ):
     """Get current user's comments."""
-    comments = await get_user_comments(session, current_user.id)
-    return [CommentRead.model_validate(c) for c in comments]
+    comments = await get_user_comments(session, current_user.id, skip=skip, limit=limit)
+    # CommentTree dicts already have the CommentRead shape
+    return RowsJSONResponse(comments)
 
 
 @router.get("/{comment_id}", response_model=CommentRead)
@@ -63,7 +67,7 @@ async def read_comment(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Comment not found"
         )
-    return CommentRead.model_validate(comment)
+    return build_comment_read(comment)
 
 
 @router.get("/{comment_id}/replies", response_model=List[CommentRead])
@@ -73,7 +77,7 @@ async def read_comment_replies(
 ):
     """Get replies to a comment."""
     replies = await get_comment_replies(session, comment_id)
-    return [CommentRead.model_validate(r) for r in replies]
+    return RowsJSONResponse(replies)
 
 
 @router.put("/{comment_id}", response_model=CommentRead)
@@ -90,7 +94,7 @@ async def update_existing_comment(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Comment not found or you don't have permission to edit"
         )
-    return CommentRead.model_validate(comment)
+    return build_comment_read(comment)
 
 
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
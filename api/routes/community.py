@@ -5,16 +5,19 @@ from typing import List
 from api.core.db.community_crud import (
     get_community_by_id, get_communities, get_user_communities, get_owned_communities,
     create_community, update_community, delete_community, join_community, leave_community,
-    add_moderator, remove_moderator, is_community_owner, is_community_moderator,
-    is_community_member, update_community_avatar as update_community_avatar_crud,
+    add_moderator, remove_moderator, is_community_owner, get_community_role,
+    get_moderator_candidate_status, update_community_avatar as update_community_avatar_crud,
     delete_community_avatar as delete_community_avatar_crud
 )
-from api.core.db.user_crud import get_user_by_id
-from api.core.schemas import CommunityCreate, CommunityUpdate, CommunityRead, CommunityModeratorAdd, CommunityModeratorRemove
+from api.core.schemas import (
+    CommunityCreate, CommunityUpdate, CommunityRead, CommunityModeratorAdd, CommunityModeratorRemove, build_community_read,
+    community_read_dict
+)
 from api.core.database import get_async_session
 from api.core.dependencies import get_current_user, get_current_active_user
 from api.core.models import User, Community
 from api.core.file_upload import file_upload_service
+from api.core.responses import RowsJSONResponse
 
 router = APIRouter(prefix="/communities", tags=["communities"])
 
@@ -28,7 +31,7 @@ async def create_new_community(
 ):
     """Create a new community."""
     community = await create_community(session, community_in, current_user.id)
-    return CommunityRead.model_validate(community)
+    return build_community_read(community)
 
 
 @router.get("/", response_model=List[CommunityRead])
@@ -39,37 +42,32 @@ async def read_communities(
 ):
     """Get all communities."""
     communities = await get_communities(session, skip=skip, limit=limit)
-    return [CommunityRead.model_validate(c) for c in communities]
+    return RowsJSONResponse([community_read_dict(c) for c in communities])
 
 
 @router.get("/my", response_model=List[CommunityRead])
+@router.get("/subscriptions", response_model=List[CommunityRead])
 async def read_my_communities(
+    skip: int = 0,
+    limit: int = 100,
     current_user: User = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_async_session)
 ):
-    """Get communities the current user is a member of."""
-    communities = await get_user_communities(session, current_user.id)
-    return [CommunityRead.model_validate(c) for c in communities]
+    """Get communities the current user is a member of (also served as /subscriptions)."""
+    communities = await get_user_communities(session, current_user.id, skip=skip, limit=limit)
+    return RowsJSONResponse([community_read_dict(c) for c in communities])
 
 
 @router.get("/owned", response_model=List[CommunityRead])
 async def read_owned_communities(
+    skip: int = 0,
+    limit: int = 100,
     current_user: User = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_async_session)
 ):
     """Get communities owned by the current user."""
-    communities = await get_owned_communities(session, current_user.id)
-    return [CommunityRead.model_validate(c) for c in communities]
-
-
-@router.get("/subscriptions", response_model=List[CommunityRead])
-async def list_my_subscriptions(
-    current_user: User = Depends(get_current_active_user),
-    session: AsyncSession = Depends(get_async_session)
-):
-    """List communities the current user is subscribed to (alias of /my)."""
-    communities = await get_user_communities(session, current_user.id)
-    return [CommunityRead.model_validate(c) for c in communities]
+    communities = await get_owned_communities(session, current_user.id, skip=skip, limit=limit)
+    return RowsJSONResponse([community_read_dict(c) for c in communities])
 
 
 @router.get("/{community_id}", response_model=CommunityRead)
@@ -84,7 +82,7 @@ async def read_community(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Community not found"
         )
-    return CommunityRead.model_validate(community)
+    return build_community_read(community)
 
 
 @router.put("/{community_id}", response_model=CommunityRead)
@@ -96,10 +94,7 @@ async def update_existing_community(
 ):
     """Update community information."""
     # Check if user is owner or moderator
-    is_owner = await is_community_owner(session, community_id, current_user.id)
-    is_moderator = await is_community_moderator(session, community_id, current_user.id)
-    
-    if not (is_owner or is_moderator):
+    if await get_community_role(session, community_id, current_user.id) is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to update this community"
@@ -111,7 +106,7 @@ async def update_existing_community(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Community not found"
         )
-    return CommunityRead.model_validate(community)
+    return build_community_read(community)
 
 
 @router.delete("/{community_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -186,16 +181,15 @@ async def add_community_moderator(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Add a moderator to the community (only owner can do this)."""
-    # Verify the target user exists
-    target_user = await get_user_by_id(session, moderator_data.user_id)
-    if not target_user:
+    # Verify the target user exists and is a community member (one query for both)
+    user_exists, is_member = await get_moderator_candidate_status(session, community_id, moderator_data.user_id)
+    if not user_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
-    # Verify target user is a community member
-    if not await is_community_member(session, community_id, moderator_data.user_id):
+
+    if not is_member:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User must be a community member to become a moderator"
@@ -237,32 +231,24 @@ async def upload_community_avatar(
 ):
     """Upload or update community avatar."""
     # Check if user is owner or moderator
-    is_owner = await is_community_owner(session, community_id, current_user.id)
-    is_moderator = await is_community_moderator(session, community_id, current_user.id)
-    
-    if not (is_owner or is_moderator):
+    if await get_community_role(session, community_id, current_user.id) is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to update community avatar"
         )
     
-    try:
-        # Upload file
-        avatar_url = await file_upload_service.upload_community_avatar(file, community_id)
-        
-        # Update community avatar in database
-        community = await update_community_avatar_crud(session, community_id, avatar_url)
-        if not community:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Error updating community avatar"
-            )
-        return CommunityRead.model_validate(community)
-    except Exception as e:
+    # Upload errors are already HTTPExceptions; anything else is a server error
+    avatar_url = await file_upload_service.upload_community_avatar(file, community_id)
+
+    # Update community avatar in database
+    community = await update_community_avatar_crud(session, community_id, avatar_url)
+    if not community:
+        await file_upload_service.delete_file(avatar_url)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+            detail="Error updating community avatar"
         )
+    return build_community_read(community)
 
 
 @router.delete("/{community_id}/avatar", response_model=CommunityRead)
@@ -273,10 +259,7 @@ async def delete_community_avatar(
 ):
     """Delete community avatar."""
     # Check if user is owner or moderator
-    is_owner = await is_community_owner(session, community_id, current_user.id)
-    is_moderator = await is_community_moderator(session, community_id, current_user.id)
-    
-    if not (is_owner or is_moderator):
+    if await get_community_role(session, community_id, current_user.id) is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to delete community avatar"
@@ -289,14 +272,14 @@ async def delete_community_avatar(
             detail="No community avatar to delete"
         )
     
-    # Delete file from storage
-    await file_upload_service.delete_file(community.avatar_url)
-    
-    # Update community in database
+    avatar_url = community.avatar_url
     community = await delete_community_avatar_crud(session, community_id)
     if not community:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Error deleting community avatar"
         )
-    return CommunityRead.model_validate(community)
\ No newline at end of file
+
+    # Remove the file only once the row no longer points at it
+    await file_upload_service.delete_file(avatar_url)
+    return build_community_read(community)
\ No newline at end of file
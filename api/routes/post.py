@@ -1,18 +1,20 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from api.core.db.post_crud import (
-    create_post, get_post_by_id, get_posts, get_user_posts, get_community_posts,
-    update_post, delete_post, like_post, unlike_post, get_post_likes,
+    create_post, get_post_read, get_posts, get_user_posts, get_community_posts,
+    update_post, delete_post, like_post, unlike_post, get_post_like_count, get_post_likes,
     add_photos_to_post, remove_photo_from_post
 )
-from api.core.db.community_crud import is_community_member, is_community_owner, is_community_moderator
-from api.core.schemas import PostCreate, PostUpdate, PostRead, LikeResponse
+from api.core.db.community_crud import get_community_role
+from api.core.schemas import PostCreate, PostUpdate, PostRead, LikeResponse, build_post_read, post_read_dict
 from api.core.database import get_async_session
 from api.core.dependencies import get_current_user, get_current_active_user
 from api.core.models import User
 from api.core.file_upload import file_upload_service
+from api.core.responses import RowsJSONResponse, RenderedJSONResponse
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
@@ -26,17 +28,14 @@ async def create_new_post(
     """Create a new post."""
     # If posting to community, verify user is owner or moderator (members cannot post)
     if post_in.community_id:
-        is_owner = await is_community_owner(session, post_in.community_id, current_user.id)
-        is_moderator = await is_community_moderator(session, post_in.community_id, current_user.id)
-        
-        if not (is_owner or is_moderator):
+        if await get_community_role(session, post_in.community_id, current_user.id) is None:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only community owner or moderators can create posts"
             )
     
     post = await create_post(session, post_in, current_user.id)
-    return PostRead.model_validate(post)
+    return build_post_read(post)
 
 
 @router.get("/", response_model=List[PostRead])
@@ -49,19 +48,21 @@ async def read_posts(
     """Get posts (optionally filtered by community)."""
     if community_id:
         posts = await get_community_posts(session, community_id, skip=skip, limit=limit)
-    else:
-        posts = await get_posts(session, skip=skip, limit=limit)
-    return [PostRead.model_validate(p) for p in posts]
+        return RowsJSONResponse([post_read_dict(p) for p in posts])
+    # Already rendered JSON (see the cache decorator)
+    return RenderedJSONResponse(await get_posts(session, skip=skip, limit=limit))
 
 
 @router.get("/my", response_model=List[PostRead])
 async def read_my_posts(
+    skip: int = 0,
+    limit: int = 100,
     current_user: User = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_async_session)
 ):
     """Get current user's posts."""
-    posts = await get_user_posts(session, current_user.id)
-    return [PostRead.model_validate(p) for p in posts]
+    posts = await get_user_posts(session, current_user.id, skip=skip, limit=limit)
+    return RowsJSONResponse([post_read_dict(p) for p in posts])
 
 
 @router.get("/{post_id}", response_model=PostRead)
@@ -70,13 +71,13 @@ async def read_post(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Get post by ID."""
-    post = await get_post_by_id(session, post_id)
+    post = await get_post_read(session, post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
-    return PostRead.model_validate(post)
+    return post
 
 
 @router.put("/{post_id}", response_model=PostRead)
@@ -93,7 +94,7 @@ async def update_existing_post(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found or you don't have permission to edit"
         )
-    return PostRead.model_validate(post)
+    return build_post_read(post)
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -126,8 +127,7 @@ async def like_post_endpoint(
             detail="Error liking post or already liked"
         )
     
-    post = await get_post_by_id(session, post_id)
-    return LikeResponse(liked=True, like_count=len(post.likes))
+    return LikeResponse(liked=True, like_count=await get_post_like_count(session, post_id))
 
 
 @router.post("/{post_id}/unlike", response_model=LikeResponse)
@@ -144,8 +144,7 @@ async def unlike_post_endpoint(
             detail="Error unliking post or not liked"
         )
     
-    post = await get_post_by_id(session, post_id)
-    return LikeResponse(liked=False, like_count=len(post.likes))
+    return LikeResponse(liked=False, like_count=await get_post_like_count(session, post_id))
 
 
 @router.post("/{post_id}/photos")
@@ -156,19 +155,25 @@ async def add_post_photos(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Add photos to post."""
-    try:
-        photo_urls = []
-        for file in files:
-            photo_url = await file_upload_service.upload_post_photo(file, post_id)
-            photo_urls.append(photo_url)
-        
-        await add_photos_to_post(session, post_id, photo_urls, current_user.id)
-        return {"message": "Photos added successfully", "photo_urls": photo_urls}
-    except Exception as e:
+    # Files are saved concurrently; if any upload fails the saved ones are removed
+    # and its error (already an HTTPException for bad files) is raised
+    results = await asyncio.gather(
+        *(file_upload_service.upload_post_photo(file, post_id) for file in files),
+        return_exceptions=True,
+    )
+    photo_urls = [r for r in results if isinstance(r, str)]
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        await asyncio.gather(*(file_upload_service.delete_file(url) for url in photo_urls))
+        raise errors[0]
+
+    if not await add_photos_to_post(session, post_id, photo_urls, current_user.id):
+        await asyncio.gather(*(file_upload_service.delete_file(url) for url in photo_urls))
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found or you don't have permission to edit"
         )
+    return {"message": "Photos added successfully", "photo_urls": photo_urls}
 
 
 @router.delete("/{post_id}/photos/{photo_id}")
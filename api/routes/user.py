@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
@@ -7,16 +8,21 @@ from api.core.db.user_crud import (
     get_user_by_id, get_users, create_user, delete_user,
     authenticate_user, change_user_password, get_user_by_email,
     update_current_user as update_current_user_crud, add_skill_to_user, remove_skill_from_user, 
-    get_all_skills, get_user_skills, get_user_by_vk_id, update_user_vk_info, 
-    create_user_from_vk, update_user_profile_photo, delete_user_profile_photo
+    get_all_skills, get_user_skills, update_vk_user_profile, link_vk_to_user_by_email,
+    create_user_from_vk, update_user_profile_photo, delete_user_profile_photo, get_user_upload_urls,
+    USER_READ_LOAD
+)
+from api.core.schemas import (
+    UserCreate, UserRead, UserLogin, Token, UserUpdate, UserChangePassword, VKAuthRequest, VKAuthResponse, build_user_read,
+    user_read_dict
 )
-from api.core.schemas import UserCreate, UserRead, UserLogin, Token, UserUpdate, UserChangePassword, VKAuthRequest, VKAuthResponse
 from api.core.database import get_async_session
 from api.core.security import create_access_token
 from api.core.dependencies import get_current_user, get_current_active_user
 from api.core.models import User
 from api.core.vk_oauth import vk_oauth_service
 from api.core.file_upload import file_upload_service
+from api.core.responses import RowsJSONResponse
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -26,7 +32,7 @@ router = APIRouter(prefix="/users", tags=["users"])
 async def register_user(user_in: UserCreate, session: AsyncSession = Depends(get_async_session)):
     """Create a new user."""
     # Check if user already exists by email
-    existing_user = await get_user_by_email(session, user_in.email)
+    existing_user = await get_user_by_email(session, user_in.email, load=())
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -34,7 +40,7 @@ async def register_user(user_in: UserCreate, session: AsyncSession = Depends(get
         )
     
     user = await create_user(session, user_in)
-    return user
+    return build_user_read(user)
 
 
 @router.post("/login", response_model=Token)
@@ -53,9 +59,12 @@ async def login_user(user_in: UserLogin, session: AsyncSession = Depends(get_asy
 
 # --- Current User Endpoints ---
 @router.get("/me", response_model=UserRead)
-async def read_current_user(current_user: User = Depends(get_current_active_user)):
+async def read_current_user(
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session)
+):
     """Get current user information."""
-    return current_user
+    return RowsJSONResponse(user_read_dict(await get_user_by_id(session, current_user.id, load=USER_READ_LOAD)))
 
 
 @router.put("/me", response_model=UserRead)
@@ -71,7 +80,7 @@ async def update_current_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Error updating user"
         )
-    return updated_user
+    return RowsJSONResponse(user_read_dict(updated_user))
 
 
 @router.post("/me/change-password")
@@ -103,23 +112,18 @@ async def upload_profile_photo(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Upload or update user profile photo."""
-    try:
-        # Upload file
-        photo_url = await file_upload_service.upload_profile_photo(file, current_user.id)
-        
-        # Update user profile photo in database
-        user = await update_user_profile_photo(session, current_user.id, photo_url)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Error updating profile photo"
-            )
-        return user
-    except Exception as e:
+    # Upload errors are already HTTPExceptions; anything else is a server error
+    photo_url = await file_upload_service.upload_profile_photo(file, current_user.id)
+
+    # Update user profile photo in database
+    user = await update_user_profile_photo(session, current_user.id, photo_url)
+    if not user:
+        await file_upload_service.delete_file(photo_url)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+            detail="Error updating profile photo"
         )
+    return RowsJSONResponse(user_read_dict(user))
 
 
 @router.delete("/me/profile-photo", response_model=UserRead)
@@ -134,17 +138,17 @@ async def delete_profile_photo(
             detail="No profile photo to delete"
         )
     
-    # Delete file from storage
-    await file_upload_service.delete_file(current_user.profile_photo)
-    
-    # Update user in database
+    photo_url = current_user.profile_photo
     user = await delete_user_profile_photo(session, current_user.id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Error deleting profile photo"
         )
-    return user
+
+    # Remove the file only once the row no longer points at it
+    await file_upload_service.delete_file(photo_url)
+    return RowsJSONResponse(user_read_dict(user))
 
 
 # --- Skills Endpoints ---
@@ -155,7 +159,7 @@ async def get_current_user_skills(
 ):
     """Get current user skills."""
     skills = await get_user_skills(session, current_user.id)
-    return {"skills": skills}
+    return RowsJSONResponse({"skills": skills})
 
 
 @router.post("/me/skills")
@@ -193,8 +197,7 @@ async def remove_skill_from_current_user(
 @router.get("/skills/all")
 async def get_all_available_skills(session: AsyncSession = Depends(get_async_session)):
     """Get all available skills."""
-    skills = await get_all_skills(session)
-    return [skill.name for skill in skills]
+    return RowsJSONResponse(await get_all_skills(session))
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
@@ -203,12 +206,16 @@ async def delete_current_user(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Delete current user account."""
+    upload_urls = await get_user_upload_urls(session, current_user.id)
     success = await delete_user(session, current_user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Error deleting user"
         )
+
+    # Remove uploaded files only once the rows are gone
+    await asyncio.gather(*(file_upload_service.delete_file(url) for url in upload_urls))
     return None
 
 
@@ -221,7 +228,7 @@ async def read_users(
 ):
     """Get list of users."""
     users = await get_users(session, skip=skip, limit=limit)
-    return users
+    return RowsJSONResponse([user_read_dict(u) for u in users])
 
 
 @router.get("/{user_id}", response_model=UserRead)
@@ -230,13 +237,13 @@ async def read_user(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Get user by ID."""
-    user = await get_user_by_id(session, user_id)
+    user = await get_user_by_id(session, user_id, load=USER_READ_LOAD)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="User not found"
         )
-    return user
+    return RowsJSONResponse(user_read_dict(user))
 
 
 # --- VK OAuth Endpoints ---
@@ -296,31 +303,19 @@ async def vk_auth_callback(
     if email:
         vk_user_info.email = email
 
-    # Check if user already exists with this VK ID
-    existing_user = await get_user_by_vk_id(session, vk_user_id)
+    # Returning VK user: refresh the profile in the same statement that finds them
+    user = await update_vk_user_profile(session, vk_user_id, vk_user_info)
     is_new_user = False
 
-    if existing_user:
-        # Update user info from VK
-        user = await update_user_vk_info(session, existing_user.id, vk_user_info)
-    else:
-        # Check if user exists with the same email
-        if vk_user_info.email:
-            existing_user_by_email = await get_user_by_email(session, vk_user_info.email)
-            if existing_user_by_email:
-                # Link VK account to existing user
-                existing_user_by_email.vk_id = vk_user_id
-                existing_user_by_email.vk_avatar = vk_user_info.photo_200
-                await session.commit()
-                user = existing_user_by_email
-            else:
-                # Create new user
-                user = await create_user_from_vk(session, vk_user_info)
-                is_new_user = True
-        else:
-            # Create new user without email
+    # Otherwise link VK to the account with the same email, or create a new one
+    if user is None and vk_user_info.email:
+        user = await link_vk_to_user_by_email(session, vk_user_info.email, vk_user_id, vk_user_info.photo_200)
+    if user is None:
+        try:
             user = await create_user_from_vk(session, vk_user_info)
-            is_new_user = True
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        is_new_user = True
 
     # Create JWT token
     jwt_token = create_access_token(data={"user_id": user.id, "email": user.email})
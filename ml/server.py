@@ -1,15 +1,28 @@
 # server.py
 import os
+
+# Один поток BLAS/OpenMP на запрос: параллелизм даёт пул потоков, а не BLAS
+# (иначе N запросов × N потоков BLAS дерутся за ядра). Задаётся до импорта numpy.
+for _var in ("OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "OMP_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
 import json
 import time
+import asyncio
+import threading
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 
 import joblib
 import numpy as np
+import scipy.sparse as sp
 import aiohttp
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 # ================================
@@ -27,10 +40,17 @@ except Exception:
 ARTIFACTS_DIR = Path(os.getenv("ARTIFACTS_DIR", "artifacts")).expanduser().resolve()
 DEFAULT_THR = float(os.getenv("DEFAULT_THR", "0.5"))
 
+# Микробатчинг /predict: запросы, пришедшие за окно, идут в один decision_function
+PREDICT_BATCH_WINDOW_SEC = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "5")) / 1000.0
+PREDICT_BATCH_MAX = int(os.getenv("PREDICT_BATCH_MAX", "64"))
+# Сколько батчей считаются одновременно (по потоку на батч)
+PREDICT_WORKERS = int(os.getenv("PREDICT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
 # Внешний API каталога (для рекомендаций)
 MP_API_BASE = os.getenv("MP_API_BASE", "https://mosprom.misis-team.ru").rstrip("/")
 MP_API_TIMEOUT = float(os.getenv("MP_API_TIMEOUT", "8.0"))
 MP_API_PAGE_LIMIT = int(os.getenv("MP_API_PAGE_LIMIT", "100"))
+MP_API_PAGE_CONCURRENCY = int(os.getenv("MP_API_PAGE_CONCURRENCY", "8"))  # страниц за раунд после первой
 MP_API_TOKEN = os.getenv("MP_API_TOKEN", "")
 MP_API_HEADERS = {"accept": "application/json"}
 if MP_API_TOKEN:
@@ -42,14 +62,34 @@ CACHE_TTL_SEC = int(os.getenv("MP_API_CACHE_TTL", "60"))
 # ================================
 # App
 # ================================
-app = FastAPI(title="ML Service (simple)", version="1.1")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # грузим модель до первого запроса; без артефактов сервис стартует, а /predict отдаёт 500
+    try:
+        _ensure_artifacts()
+    except FileNotFoundError as e:
+        print(f"[WARN] {e}")
+    yield
+    await _close_http_session()
+
+app = FastAPI(title="ML Service (simple)", version="1.1", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # ================================
 # Globals
 # ================================
 PIPE = None                # sklearn Pipeline
 LABELS: List[str] = []     # порядок меток (из labels.json)
+LABELS_ARR = None          # те же метки как np.ndarray(dtype=object) для выборки по индексам
 THRESHOLDS = None          # np.ndarray [L] или None
+LOGIT_THRESHOLDS = None    # logit(порогов) [L]: сравниваем сырые скоры без сигмоиды
+
+HTTP_SESSION: Optional[aiohttp.ClientSession] = None  # общий клиент к MP API (keep-alive, DNS-кэш)
+
+_artifacts_lock = threading.Lock()
+_reco_lock = threading.Lock()  # индекс рекомендаций перестраивает один поток
+_predict_pool = ThreadPoolExecutor(max_workers=PREDICT_WORKERS, thread_name_prefix="predict")
+_predict_queue: asyncio.Queue = asyncio.Queue()  # (description, future)
+_predict_worker: Optional[asyncio.Task] = None
 
 _cache_comm: Dict[str, Any] = {"ts": 0.0, "items": []}
 _cache_posts: Dict[str, Any] = {"ts": 0.0, "items": []}
@@ -64,19 +104,25 @@ def _normalize_text(s: str) -> str:
     s = s.replace("ё", "е")
     return s.strip()
 
+_TOKEN_SYNONYMS = {
+    "cpp": "c++",
+    "c plus plus": "c++",
+    "c-плюс-плюс": "c++",
+    "си": "c",
+    "js": "javascript",
+}
+_YO_TABLE = str.maketrans("ё", "е")
+
 def _norm_token(t: str) -> str:
     if not isinstance(t, str):
         return ""
-    s = unicodedata.normalize("NFC", t).strip().lower()
-    s = s.replace("ё", "е")
-    synonyms = {
-        "cpp": "c++",
-        "c plus plus": "c++",
-        "c-плюс-плюс": "c++",
-        "си": "c",
-        "js": "javascript",
-    }
-    return synonyms.get(s, s)
+    return _norm_str_token(t)
+
+# навыки сильно повторяются между объектами каталога: нормализуем каждый один раз
+@lru_cache(maxsize=4096)
+def _norm_str_token(t: str) -> str:
+    s = unicodedata.normalize("NFC", t).strip().lower().translate(_YO_TABLE)
+    return _TOKEN_SYNONYMS.get(s, s)
 
 def _norm_list(xs: List[str]) -> List[str]:
     out, seen = [], set()
@@ -92,7 +138,7 @@ def _norm_list(xs: List[str]) -> List[str]:
 # ================================
 def load_artifacts():
     """Load sklearn pipeline, labels, optional thresholds."""
-    global PIPE, LABELS, THRESHOLDS
+    global PIPE, LABELS, LABELS_ARR, THRESHOLDS, LOGIT_THRESHOLDS
     print(f"[INFO] Using ARTIFACTS_DIR = {ARTIFACTS_DIR}")
     model_path = ARTIFACTS_DIR / "tfidf_logreg_ovr.joblib"
     labels_path = ARTIFACTS_DIR / "labels.json"
@@ -112,6 +158,7 @@ def load_artifacts():
 
     PIPE = joblib.load(model_path)
     LABELS = json.loads(labels_path.read_text(encoding="utf-8"))
+    LABELS_ARR = np.asarray(LABELS, dtype=object)
 
     if thr_path.exists():
         THRESHOLDS = np.load(thr_path)
@@ -121,34 +168,124 @@ def load_artifacts():
     else:
         THRESHOLDS = None
 
+    # sigmoid(s) >= t  <=>  s >= logit(t); пороги 0 и 1 дают -inf и +inf
+    thresholds = THRESHOLDS if THRESHOLDS is not None else np.full(len(LABELS), DEFAULT_THR, dtype=float)
+    with np.errstate(divide="ignore"):
+        LOGIT_THRESHOLDS = np.log(thresholds) - np.log1p(-thresholds)
+
+def _ensure_artifacts():
+    # батчи идут в нескольких потоках: артефакты грузим один раз
+    if LOGIT_THRESHOLDS is None:
+        with _artifacts_lock:
+            if LOGIT_THRESHOLDS is None:
+                load_artifacts()
+
 # ================================
 # ML predict
 # ================================
 class PredictRequest(BaseModel):
     description: str
 
-def predict_labels(description: str) -> List[str]:
-    if PIPE is None or not LABELS:
-        load_artifacts()
-
-    text = _normalize_text(description or "")
-    if not text:
-        return []
+def predict_labels_batch(descriptions: List[str]) -> List[List[str]]:
+    """Predict labels for several descriptions with one decision_function call."""
+    texts = [_normalize_text(d or "") for d in descriptions]
+    out: List[List[str]] = [[] for _ in texts]
+    rows = [i for i, text in enumerate(texts) if text]
+    if not rows:
+        return out
+
+    _ensure_artifacts()
+
+    # сигмоида монотонна: порог и сортировку считаем прямо по скорам
+    scores = PIPE.decision_function([texts[i] for i in rows])  # (B, L)
+    passed = scores >= LOGIT_THRESHOLDS                        # (B, L)
+
+    for i, s, mask in zip(rows, scores, passed):
+        idx = np.flatnonzero(mask)
+        if idx.size:
+            idx_sorted = idx[np.argsort(-s[idx])]
+            out[i] = LABELS_ARR[idx_sorted].tolist()
+    return out
 
-    scores = PIPE.decision_function([text])   # (1, L)
-    probs = 1.0 / (1.0 + np.exp(-scores))[0]  # (L,)
-    thresholds = THRESHOLDS if THRESHOLDS is not None else np.full(len(LABELS), DEFAULT_THR, dtype=float)
+def predict_labels(description: str) -> List[str]:
+    return predict_labels_batch([description])[0]
+
+async def _predict_batcher():
+    """Collect queued /predict requests for up to PREDICT_BATCH_WINDOW_SEC and score them together."""
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(PREDICT_WORKERS)
+    running = set()
+    batch: List[Tuple[str, asyncio.Future]] = []
+    try:
+        while True:
+            batch = [await _predict_queue.get()]
+            deadline = loop.time() + PREDICT_BATCH_WINDOW_SEC
+            while len(batch) < PREDICT_BATCH_MAX:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(_predict_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
 
-    idx = np.where(probs >= thresholds)[0]
-    if idx.size == 0:
+            # пока все потоки заняты, новые запросы копятся в очереди и уйдут следующим батчем
+            await slots.acquire()
+            task = asyncio.create_task(_run_predict_batch(batch, slots))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            batch = []
+    except Exception as e:
+        # собранный, но не отправленный батч иначе никто не дождётся
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_exception(e)
+        raise
+
+def _on_predict_worker_done(task: asyncio.Task):
+    """Log a crashed batcher and fail the requests still queued for it."""
+    if task.cancelled() or task.exception() is None:
+        return
+    print(f"[WARN] Воркер /predict упал: {task.exception()!r}")
+    if task is not _predict_worker:
+        return  # очередь уже разбирает перезапущенный воркер
+    while not _predict_queue.empty():
+        _, fut = _predict_queue.get_nowait()
+        if not fut.done():
+            fut.set_exception(RuntimeError(f"predict worker crashed: {task.exception()!r}"))
+
+async def _run_predict_batch(batch: List[Tuple[str, asyncio.Future]], slots: asyncio.Semaphore):
+    loop = asyncio.get_running_loop()
+    try:
+        results = await loop.run_in_executor(_predict_pool, predict_labels_batch, [d for d, _ in batch])
+    except Exception as e:
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_exception(e)
+        return
+    finally:
+        slots.release()
+    for (_, fut), labels in zip(batch, results):
+        if not fut.done():
+            fut.set_result(labels)
+
+async def predict_labels_batched(description: str) -> List[str]:
+    global _predict_worker
+    # пустой текст ничего не предскажет: не занимаем место в батче
+    if not description or description.isspace():
         return []
-    idx_sorted = idx[np.argsort(-probs[idx])]
-    return [LABELS[i] for i in idx_sorted]
+    if _predict_worker is None or _predict_worker.done():
+        # перезапускаем только задачу: очередь и запросы в ней остаются прежними
+        _predict_worker = asyncio.create_task(_predict_batcher())
+        _predict_worker.add_done_callback(_on_predict_worker_done)
+    fut = asyncio.get_running_loop().create_future()
+    await _predict_queue.put((description, fut))
+    return await fut
 
 @app.post("/predict", response_model=List[str])
-def predict(req: PredictRequest) -> List[str]:
+async def predict(req: PredictRequest) -> List[str]:
     try:
-        return predict_labels(req.description)
+        return await predict_labels_batched(req.description)
     except FileNotFoundError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
@@ -161,103 +298,212 @@ def ping():
 # ================================
 # External API clients (catalog)
 # ================================
+def _get_http_session() -> aiohttp.ClientSession:
+    """Shared MP API session, created lazily inside the running loop."""
+    global HTTP_SESSION
+    if HTTP_SESSION is None or HTTP_SESSION.closed:
+        HTTP_SESSION = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=MP_API_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=60),
+        )
+    return HTTP_SESSION
+
+async def _close_http_session():
+    global HTTP_SESSION
+    if HTTP_SESSION is not None:
+        await HTTP_SESSION.close()
+        HTTP_SESSION = None
+
+async def _fetch_page(session: aiohttp.ClientSession, endpoint: str, skip: int) -> Optional[List[Dict[str, Any]]]:
+    """GET one page of /communities/ or /posts/; None if the API did not return a list."""
+    url = f"{MP_API_BASE}/{endpoint}?skip={skip}&limit={MP_API_PAGE_LIMIT}"
+    async with session.get(url, headers=MP_API_HEADERS) as resp:
+        if resp.status != 200:
+            text = await resp.text()
+            raise HTTPException(status_code=resp.status, detail=f"API error: {text}")
+        try:
+            page = await resp.json()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Invalid json from API: {e}")
+    return page if isinstance(page, list) else None
+
 async def _get_all(endpoint: str) -> List[Dict[str, Any]]:
     """GET paginate: /communities/ or /posts/ using aiohttp"""
     items = []
-    skip = 0
-    timeout = aiohttp.ClientTimeout(total=MP_API_TIMEOUT)
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        while True:
-            url = f"{MP_API_BASE}/{endpoint}?skip={skip}&limit={MP_API_PAGE_LIMIT}"
-            async with session.get(url, headers=MP_API_HEADERS) as resp:
-                if resp.status != 200:
-                    text = await resp.text()
-                    raise HTTPException(status_code=resp.status, detail=f"API error: {text}")
-                try:
-                    page = await resp.json()
-                except Exception as e:
-                    raise HTTPException(status_code=500, detail=f"Invalid json from API: {e}")
-                if not isinstance(page, list):
-                    break
-                items.extend(page)
-                if len(page) < MP_API_PAGE_LIMIT:
-                    break
-                skip += MP_API_PAGE_LIMIT
+    session = _get_http_session()
+    pages = [await _fetch_page(session, endpoint, 0)]
+    skip = MP_API_PAGE_LIMIT
+    while True:
+        # страницы разбираем по порядку до первой неполной
+        for page in pages:
+            if page is None:
+                return items
+            items.extend(page)
+            if len(page) < MP_API_PAGE_LIMIT:
+                return items
+        # первая страница полная — следующие запрашиваем пачкой параллельно
+        pages = await asyncio.gather(*(
+            _fetch_page(session, endpoint, skip + n * MP_API_PAGE_LIMIT)
+            for n in range(MP_API_PAGE_CONCURRENCY)
+        ))
+        skip += MP_API_PAGE_CONCURRENCY * MP_API_PAGE_LIMIT
+
+async def _refresh_cached(cache: Dict[str, Any], endpoint: str) -> List[Dict[str, Any]]:
+    items = await _get_all(endpoint)
+    cache["items"] = items
+    cache["ts"] = time.time()
     return items
 
+def _log_refresh_error(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[WARN] Не удалось обновить кэш каталога: {task.exception()}")
+
+async def _get_cached(cache: Dict[str, Any], endpoint: str) -> List[Dict[str, Any]]:
+    """TTL cache with single-flight refresh; stale items (< 2*TTL old) are served while refreshing."""
+    age = time.time() - cache["ts"]
+    if age <= CACHE_TTL_SEC:
+        return cache["items"]
+
+    # одно обновление на всех: конкурентные запросы ждут ту же задачу
+    task = cache.get("refresh")
+    if task is None or task.done():
+        task = asyncio.create_task(_refresh_cached(cache, endpoint))
+        task.add_done_callback(_log_refresh_error)
+        cache["refresh"] = task
+
+    if age <= 2 * CACHE_TTL_SEC:
+        return cache["items"]
+    # shield: отмена одного запроса не отменяет общее обновление
+    return await asyncio.shield(task)
+
 async def _get_communities() -> List[Dict[str, Any]]:
-    now = time.time()
-    if now - _cache_comm["ts"] > CACHE_TTL_SEC:
-        _cache_comm["items"] = await _get_all("communities/")
-        _cache_comm["ts"] = now
-    return _cache_comm["items"]
+    return await _get_cached(_cache_comm, "communities/")
 
 async def _get_posts() -> List[Dict[str, Any]]:
-    now = time.time()
-    if now - _cache_posts["ts"] > CACHE_TTL_SEC:
-        _cache_posts["items"] = await _get_all("posts/")
-        _cache_posts["ts"] = now
-    return _cache_posts["items"]
+    return await _get_cached(_cache_posts, "posts/")
 
 # ================================
 # Reco: one-hot + cosine
 # ================================
-def _build_vocab(objects: List[Dict[str, Any]]) -> Dict[str, int]:
-    """Collect all skills from objects into vocab {token: index}."""
-    vocab: Dict[str, int] = {}
-    for obj in objects:
-        for tok in _norm_list(obj.get("skills", [])):
-            if tok not in vocab:
-                vocab[tok] = len(vocab)
-    return vocab
-
-def _one_hot_matrix(objects: List[Dict[str, Any]], vocab: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Return (M, ids, popularity). M: [N,L] one-hot in vocab space."""
+def _build_vocab(skills: List[List[str]]) -> Dict[str, int]:
+    """Collect all normalized skills of the objects into vocab {token: index}."""
+    # dict.fromkeys убирает повторы за один проход, сохраняя порядок первого появления
+    tokens = dict.fromkeys(tok for toks in skills for tok in toks)
+    return {tok: i for i, tok in enumerate(tokens)}
+
+def _one_hot_matrix(
+    objects: List[Dict[str, Any]], skills: List[List[str]], vocab: Dict[str, int]
+) -> Tuple[sp.csr_matrix, np.ndarray, np.ndarray, np.ndarray]:
+    """Return (M, ids, popularity, inv_row_norms). M: [N,L] sparse one-hot in vocab space.
+
+    skills[i] are the normalized skills of objects[i] (see _norm_list).
+    """
     L = len(vocab)
     if not objects or L == 0:
-        return np.zeros((0, 0), dtype=np.float32), np.zeros((0,), dtype=np.int64), np.zeros((0,), dtype=np.float32)
-
-    M = np.zeros((len(objects), L), dtype=np.float32)
-    ids = np.zeros((len(objects),), dtype=np.int64)
-    pop = np.zeros((len(objects),), dtype=np.float32)
-
-    for i, obj in enumerate(objects):
-        ids[i] = int(obj.get("id", 0))
-        pop[i] = float(obj.get("member_count", obj.get("like_count", 0)) or 0)
-        for tok in _norm_list(obj.get("skills", [])):
-            j = vocab.get(tok)
-            if j is not None:
-                M[i, j] = 1.0
-            # мягкий авто-хинт для школьной электроники:
-            if tok == "arduino":
-                jcpp = vocab.get("c++")
-                if jcpp is not None:
-                    M[i, jcpp] = 1.0
-    return M, ids, pop
+        return (sp.csr_matrix((0, 0), dtype=np.float32), np.zeros((0,), dtype=np.int64),
+                np.zeros((0,), dtype=np.float32), np.zeros((0,), dtype=np.float32))
+
+    N = len(objects)
+    ids = np.fromiter((int(obj.get("id", 0)) for obj in objects), dtype=np.int64, count=N)
+    pop = np.fromiter(
+        (float(obj.get("member_count", obj.get("like_count", 0)) or 0) for obj in objects),
+        dtype=np.float32, count=N,
+    )
+    # сразу собираем CSR-массивы (indices/indptr) без промежуточного COO и сортировки
+    get = vocab.get
+    jcpp = get("c++")
+    indices: List[int] = []
+    indptr: List[int] = [0]
+    for toks in skills:
+        row = [j for j in map(get, toks) if j is not None]
+        # мягкий авто-хинт для школьной электроники (без повтора, если c++ уже есть):
+        if jcpp is not None and "arduino" in toks and jcpp not in row:
+            row.append(jcpp)
+        indices.extend(row)
+        indptr.append(len(indices))
+
+    # навыков у объекта единицы из словаря: храним только ненулевые (CSR);
+    # значения всегда 0/1, поэтому uint8 (M @ float32-вектор всё равно даёт float32)
+    M = sp.csr_matrix(
+        (
+            np.ones(len(indices), dtype=np.uint8),
+            np.asarray(indices, dtype=np.int32),
+            np.asarray(indptr, dtype=np.int32),
+        ),
+        shape=(N, L),
+    )
+    # строки из нулей и единиц: норма = sqrt(числа единиц в строке);
+    # храним обратную, чтобы запрос делал умножение вместо деления (пустая строка -> 0)
+    counts = np.diff(M.indptr).astype(np.float32)
+    inv_row_norms = np.zeros_like(counts)
+    np.divide(1.0, np.sqrt(counts), out=inv_row_norms, where=counts > 0)
+    return M, ids, pop, inv_row_norms
+
+# навыки пользователя, к которым добавляем c++ (полезные хинты)
+_CPP_HINT_TOKENS = frozenset(("arduino", "олимпиадная информатика", "codeforces"))
 
 def _skills_to_vec(skills: List[str], vocab: Dict[str, int]) -> np.ndarray:
+    toks = _norm_list(skills)
+    get = vocab.get
+    cols = [j for j in map(get, toks) if j is not None]
+    jcpp = get("c++")
+    if jcpp is not None and not _CPP_HINT_TOKENS.isdisjoint(toks):
+        cols.append(jcpp)
+    # все единицы ставим одним присваиванием по индексам
     v = np.zeros((len(vocab),), dtype=np.float32)
-    for tok in _norm_list(skills):
-        j = vocab.get(tok)
-        if j is not None:
-            v[j] = 1.0
-        # полезные хинты
-        if tok in ("arduino", "олимпиадная информатика", "codeforces"):
-            jcpp = vocab.get("c++")
-            if jcpp is not None:
-                v[jcpp] = 1.0
+    v[np.fromiter(cols, dtype=np.intp, count=len(cols))] = 1.0
     return v
 
-def _cosine_scores(user_vec: np.ndarray, M: np.ndarray) -> np.ndarray:
-    if M.size == 0:
+def _cosine_scores(user_vec: np.ndarray, M: sp.csr_matrix, inv_row_norms: np.ndarray) -> np.ndarray:
+    if M.shape[0] == 0:
         return np.zeros((0,), dtype=np.float32)
-    un = np.linalg.norm(user_vec)
-    if un == 0.0:
+    # вектор пользователя one-hot: его норма = sqrt(числа единиц)
+    nnz = np.count_nonzero(user_vec)
+    if nnz == 0:
         return np.zeros((M.shape[0],), dtype=np.float32)
+    un = np.sqrt(nnz)
+    # разреженное умножение: работа пропорциональна числу ненулевых в M
     dots = M @ user_vec
-    norms = np.linalg.norm(M, axis=1) * un
-    norms[norms == 0.0] = 1e-8
-    return (dots / norms).astype(np.float32)
+    dots *= inv_row_norms
+    dots *= np.float32(1.0 / un)
+    return dots
+
+def _top_k(scores: np.ndarray, pop: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k best objects: by score ↓, ties by popularity ↓ (same as a full lexsort)."""
+    # полностью сортируем только кандидатов не хуже k-го score (вместе с равными ему)
+    if k < scores.size:
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        cand = np.flatnonzero(scores >= kth)
+    else:
+        cand = np.arange(scores.size)
+    order = np.lexsort((-pop[cand], -scores[cand]))
+    return cand[order[:k]]
+
+def _reco_index(cache: Dict[str, Any], objs: List[Dict[str, Any]]):
+    """Return (vocab, M, ids, pop, inv_row_norms) for objs; rebuilt only when the cached list is refreshed."""
+    # индекс хранится одним кортежем вместе со своим списком: потоки не увидят их вперемешку
+    index = cache.get("index")
+    if index is None or index[0] is not objs:
+        with _reco_lock:
+            index = cache.get("index")
+            if index is None or index[0] is not objs:
+                # навыки каждого объекта нормализуем один раз для словаря и матрицы
+                skills = [_norm_list(obj.get("skills", [])) for obj in objs]
+                vocab = _build_vocab(skills)
+                index = (objs, vocab, *_one_hot_matrix(objs, skills, vocab))
+                cache["index"] = index
+    return index[1:]
+
+def _recommend(cache: Dict[str, Any], objs: List[Dict[str, Any]], skills: List[str], k: int) -> List[Dict[str, Any]]:
+    """Top-k objects for the skills as response dicts; CPU-only, runs in a worker thread."""
+    vocab, M, ids, pop, inv_row_norms = _reco_index(cache, objs)
+    u = _skills_to_vec(skills, vocab)
+    scores = _cosine_scores(u, M, inv_row_norms)
+    if scores.size == 0:
+        return []
+    idx = _top_k(scores, pop, k)
+    # tolist() переводит numpy-скаляры в int/float одним вызовом
+    return [{"id": i, "score": sc} for i, sc in zip(ids[idx].tolist(), scores[idx].tolist())]
 
 # ================================
 # Schemas for reco
@@ -273,41 +519,24 @@ class RecoResponseItem(BaseModel):
 # ================================
 # Endpoints: recommendations
 # ================================
-@app.post("/predict_communities", response_model=List[RecoResponseItem])
-async def predict_communities(req: RecoRequest) -> List[RecoResponseItem]:
+async def _predict_reco(fetch, cache: Dict[str, Any], req: RecoRequest) -> ORJSONResponse:
+    """Shared body of the recommendation endpoints: fetch the catalog, then score it off the loop."""
     try:
-        objs = await _get_communities()
-        vocab = _build_vocab(objs)
-        M, ids, pop = _one_hot_matrix(objs, vocab)
-        u = _skills_to_vec(req.skills, vocab)
-        scores = _cosine_scores(u, M)
-        if scores.size == 0:
-            return []
-        # сортировка: по score (cosine) ↓, тай-брейк — по популярности ↓
-        order = np.lexsort((-pop, -scores))
-        k = max(1, int(req.limit or 50))
-        idx = order[:k]
-        return [RecoResponseItem(id=int(ids[i]), score=float(scores[i])) for i in idx]
+        objs = await fetch()
+        # numpy/scipy-часть считаем в потоке, чтобы не держать event loop
+        items = await asyncio.to_thread(_recommend, cache, objs, req.skills, max(1, int(req.limit or 50)))
+        # готовые dict сразу в orjson, без повторной валидации по response_model
+        return ORJSONResponse(items)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal error: {e}")
 
+@app.post("/predict_communities", response_model=List[RecoResponseItem])
+async def predict_communities(req: RecoRequest) -> List[RecoResponseItem]:
+    return await _predict_reco(_get_communities, _cache_comm, req)
+
 @app.post("/predict_posts", response_model=List[RecoResponseItem])
 async def predict_posts(req: RecoRequest) -> List[RecoResponseItem]:
-    try:
-        objs = await _get_posts()
-        vocab = _build_vocab(objs)
-        M, ids, pop = _one_hot_matrix(objs, vocab)
-        u = _skills_to_vec(req.skills, vocab)
-        scores = _cosine_scores(u, M)
-        if scores.size == 0:
-            return []
-        # сортировка: по score (cosine) ↓, тай-брейк — по популярности ↓
-        order = np.lexsort((-pop, -scores))
-        k = max(1, int(req.limit or 50))
-        idx = order[:k]
-        return [RecoResponseItem(id=int(ids[i]), score=float(scores[i])) for i in idx]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal error: {e}")
+    return await _predict_reco(_get_posts, _cache_posts, req)
 
 # ================================
 # Main
@@ -2,6 +2,7 @@ import os
 import re
 import ssl
 import uuid
+import itertools
 import time
 import html
 import asyncio
@@ -9,8 +10,9 @@ from typing import List, Optional, Literal, Dict, Any
 from contextlib import asynccontextmanager
 
 import aiohttp
+import orjson
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 # =========================
@@ -26,6 +28,8 @@ CHAT_URL = os.getenv("GIGACHAT_CHAT_URL", "https://gigachat.devices.sberbank.ru/
 
 REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "45"))
 RETRIES = int(os.getenv("RETRIES", "2"))
+# Больше этого тело ответа GigaChat не читаем (защита памяти от огромных ответов)
+MAX_RESPONSE_BYTES = int(os.getenv("MAX_RESPONSE_BYTES", str(2 * 1024 * 1024)))
 
 # SSL настройки (на свой риск можно отключить проверку)
 INSECURE_SSL = os.getenv("INSECURE_SSL", "").strip().lower() in ("1", "true", "yes")
@@ -137,7 +141,10 @@ A: Проверьте папку Спам, убедитесь в правиль
 возвращай текст без всякой форматирования. Просто сухой текст
 
 переведи это в system_promt"""
-)
+).strip()
+
+# Системное сообщение одно на все запросы (его никто не меняет)
+SYSTEM_MESSAGE: Dict[str, str] = {"role": "system", "content": SYSTEM_PROMPT}
 
 # =========================
 # Pydantic схемы
@@ -179,27 +186,38 @@ def _env_check():
 
 _env_check()
 
+# Заголовок Basic-авторизации для OAuth постоянен: собираем его один раз
+TOKEN_AUTH_HEADER = aiohttp.BasicAuth(GIGACHAT_CLIENT_ID, GIGACHAT_CLIENT_SECRET, encoding="latin1").encode()
+
 # =========================
 # HTML sanitizer + escape normalizer
 # =========================
 SCRIPT_STYLE_RE = re.compile(r"(?is)<(script|style).*?>.*?</\1>")
 TAGS_RE = re.compile(r"(?s)<[^>]+>")
-UNICODE_ESC_RE = re.compile(r"\\u([0-9a-fA-F]{4})")
+# \uXXXX, \r\n (раньше одиночного \r), \n, \r, \t, \", \\
+BACKSLASH_ESC_RE = re.compile(r'\\(u[0-9a-fA-F]{4}|r\\n|[nrt"\\])')
+BACKSLASH_ESC_MAP = {
+    "r\\n": "\n",
+    "n": "\n",
+    "r": "\r",
+    "t": "    ",  # табы -> 4 пробела
+    '"': '"',
+    "\\": "\\",
+}
+SPACES_RE = re.compile(r"[ \t\u00A0]+")
+BLANK_LINES_RE = re.compile(r"\s*\n\s*\n\s*")
+
+def _decode_escape(m: "re.Match[str]") -> str:
+    esc = m.group(1)
+    if esc[0] == "u":
+        return chr(int(esc[1:], 16))
+    return BACKSLASH_ESC_MAP[esc]
 
 def _decode_backslash_escapes(text: str) -> str:
     if not text:
         return text
-    # 1) unicode escapes: \uXXXX -> real char
-    text = UNICODE_ESC_RE.sub(lambda m: chr(int(m.group(1), 16)), text)
-    # 2) common escapes
-    text = text.replace("\\r\\n", "\n")
-    text = text.replace("\\n", "\n")
-    text = text.replace("\\r", "\r")
-    text = text.replace("\\t", "    ")  # табы -> 4 пробела
-    text = text.replace('\\"', '"')
-    # 3) обратные слеши: \\ -> \
-    text = text.replace("\\\\", "\\")
-    return text
+    # один проход слева направо: \\n остаётся "\" + "n", а не превращается в перенос
+    return BACKSLASH_ESC_RE.sub(_decode_escape, text)
 
 def clean_html(text: str) -> str:
     if not text:
@@ -213,8 +231,8 @@ def clean_html(text: str) -> str:
     # превратить \n, \t, \uXXXX, \" в нормальные символы
     text = _decode_backslash_escapes(text)
     # нормализовать пробелы/переносы
-    text = re.sub(r"[ \t\u00A0]+", " ", text)
-    text = re.sub(r"\s*\n\s*\n\s*", "\n\n", text).strip()
+    text = SPACES_RE.sub(" ", text)
+    text = BLANK_LINES_RE.sub("\n\n", text).strip()
     return text
 
 # =========================
@@ -237,39 +255,104 @@ def _build_ssl_context() -> ssl.SSLContext:
 session: Optional[aiohttp.ClientSession] = None
 _token_value: Optional[str] = None
 _token_exp: float = 0.0  # epoch seconds
+_token_lock = asyncio.Lock()  # одновременно токен обновляет только один запрос
+
+# RqUID должен быть в формате UUID4: старшие 64 бита случайны один раз на процесс,
+# младшие — счётчик запросов (без os.urandom на каждый вызов)
+_RQUID_PREFIX = uuid.uuid4().int & ~((1 << 64) - 1)
+_rquid_counter = itertools.count(1)
+
+def _rquid() -> str:
+    return str(uuid.UUID(int=_RQUID_PREFIX | next(_rquid_counter), version=4))
+
+async def _warm_up_connections():
+    """Открыть TLS-соединение к чату GigaChat заранее, чтобы первый /chat не ждал рукопожатия."""
+    # к OAuth соединение открывает _token_refresher, сразу получая токен
+    assert session is not None
+    try:
+        async with session.head(CHAT_URL, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+            await resp.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        pass  # не критично: соединение откроется при первом запросе
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global session
     timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
-    connector = aiohttp.TCPConnector(limit=100, ssl=_build_ssl_context())
-    session = aiohttp.ClientSession(timeout=timeout, connector=connector)
+    # держим соединения к GigaChat открытыми между запросами (TLS-рукопожатие дороже самого вызова)
+    connector = aiohttp.TCPConnector(
+        limit=100,
+        limit_per_host=32,
+        keepalive_timeout=300,
+        ttl_dns_cache=300,
+        ssl=_build_ssl_context(),
+    )
+    session = aiohttp.ClientSession(
+        timeout=timeout,
+        connector=connector,
+        json_serialize=lambda obj: orjson.dumps(obj).decode(),
+    )
+    background = [
+        asyncio.create_task(_warm_up_connections()),
+        asyncio.create_task(_token_refresher()),
+    ]
     try:
         yield
     finally:
+        for task in background:
+            task.cancel()
         if session:
             await session.close()
 
-app = FastAPI(title="ClubX Support Bot via GigaChat", version="1.0.2", lifespan=lifespan)
+app = FastAPI(
+    title="ClubX Support Bot via GigaChat",
+    version="1.0.2",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # =========================
 # Helpers
 # =========================
 def _build_messages(req: ChatRequest) -> List[Dict[str, str]]:
-    msgs: List[Dict[str, str]] = [{"role": "system", "content": SYSTEM_PROMPT}]
-    if req.history:
-        for turn in req.history:
-            msgs.append({"role": turn.role, "content": turn.content})
-    msgs.append({"role": "user", "content": req.message})
+    user_msg = {"role": "user", "content": req.message}
+    if not req.history:
+        return [SYSTEM_MESSAGE, user_msg]
+    msgs: List[Dict[str, str]] = [SYSTEM_MESSAGE]
+    msgs.extend({"role": turn.role, "content": turn.content} for turn in req.history)
+    msgs.append(user_msg)
     return msgs
 
+async def _read_body(resp: aiohttp.ClientResponse) -> bytes:
+    """Прочитать тело ответа GigaChat, но не больше MAX_RESPONSE_BYTES."""
+    if resp.content_length is not None and resp.content_length > MAX_RESPONSE_BYTES:
+        raise HTTPException(status_code=502, detail="GigaChat response is too large")
+    chunks: List[bytes] = []
+    size = 0
+    async for chunk in resp.content.iter_chunked(64 * 1024):
+        size += len(chunk)
+        if size > MAX_RESPONSE_BYTES:
+            raise HTTPException(status_code=502, detail="GigaChat response is too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+async def _read_text(resp: aiohttp.ClientResponse) -> str:
+    """Тело ответа как текст (для сообщений об ошибках)."""
+    return (await _read_body(resp)).decode("utf-8", errors="replace")
+
 async def _fetch_token() -> str:
     """Получить и закешировать OAuth токен GigaChat."""
-    global _token_value, _token_exp
-    now = time.time()
-    if _token_value and now < (_token_exp - 60):
+    if _token_value and time.time() < (_token_exp - 60):
         return _token_value
-
+    async with _token_lock:
+        # пока ждали блокировку, токен мог обновить другой запрос
+        if _token_value and time.time() < (_token_exp - 60):
+            return _token_value
+        return await _request_token()
+
+async def _request_token() -> str:
+    """Запросить новый OAuth токен (вызывается под _token_lock)."""
+    global _token_value, _token_exp
     if not GIGACHAT_CLIENT_ID or not GIGACHAT_CLIENT_SECRET:
         raise HTTPException(status_code=500, detail="GIGACHAT_CLIENT_ID / GIGACHAT_CLIENT_SECRET is not set")
 
@@ -277,20 +360,18 @@ async def _fetch_token() -> str:
 
     data = {"scope": GIGACHAT_SCOPE, "grant_type": "client_credentials"}
     headers = {
+        "Authorization": TOKEN_AUTH_HEADER,
         "Content-Type": "application/x-www-form-urlencoded",
         "Accept": "application/json",
-        "RqUID": str(uuid.uuid4()),
+        "RqUID": _rquid(),
     }
-    # Критично: BasicAuth формирует корректный заголовок Authorization
-    auth = aiohttp.BasicAuth(GIGACHAT_CLIENT_ID, GIGACHAT_CLIENT_SECRET, encoding="latin1")
 
     last_err = None
     for attempt in range(RETRIES + 1):
         try:
-            async with session.post(TOKEN_URL, data=data, headers=headers, auth=auth) as resp:
-                text = await resp.text()
+            async with session.post(TOKEN_URL, data=data, headers=headers) as resp:
                 if resp.status == 200:
-                    token_json = await resp.json()
+                    token_json = orjson.loads(await _read_body(resp))
                     access_token = token_json.get("access_token")
                     expires_in = token_json.get("expires_in", 0)
                     if not access_token:
@@ -298,12 +379,12 @@ async def _fetch_token() -> str:
                     _token_value = access_token
                     _token_exp = time.time() + (int(expires_in) if expires_in else 900)
                     return _token_value
-                elif resp.status in (408, 409, 429, 500, 502, 503, 504):
+                text = await _read_text(resp)
+                if resp.status in (408, 409, 429, 500, 502, 503, 504):
                     last_err = (resp.status, text)
                     await asyncio.sleep(0.7 * (2 ** attempt))
                     continue
-                else:
-                    raise HTTPException(status_code=resp.status, detail=f"GigaChat token error: {text}")
+                raise HTTPException(status_code=resp.status, detail=f"GigaChat token error: {text}")
         except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             last_err = repr(e)
             await asyncio.sleep(0.7 * (2 ** attempt))
@@ -311,6 +392,28 @@ async def _fetch_token() -> str:
 
     raise HTTPException(status_code=502, detail=f"GigaChat token upstream failed after retries: {last_err}")
 
+async def _token_refresher():
+    """Получать токен при старте и обновлять его за 2 минуты до истечения, вне запросов /chat."""
+    if not GIGACHAT_CLIENT_ID or not GIGACHAT_CLIENT_SECRET:
+        print("[WARN] GIGACHAT_CLIENT_ID / GIGACHAT_CLIENT_SECRET is not set, фоновое обновление токена отключено")
+        return
+    while True:
+        try:
+            async with _token_lock:
+                if not _token_value or time.time() >= _token_exp - 120:
+                    await _request_token()
+            delay = max(_token_exp - 120 - time.time(), 30.0)
+        except HTTPException as e:
+            # GigaChat недоступен: /chat получит токен сам, а мы попробуем позже
+            print(f"[WARN] Не удалось обновить токен GigaChat: {e.detail}")
+            delay = 30.0
+        except Exception as e:
+            # битый ответ (не JSON, не объект, кривой expires_in) не должен останавливать задачу;
+            # CancelledError не наследуется от Exception и завершает её при остановке
+            print(f"[WARN] Не удалось обновить токен GigaChat: {e!r}")
+            delay = 30.0
+        await asyncio.sleep(delay)
+
 async def _call_gigachat(messages: List[Dict[str, str]], params: Dict[str, Any]) -> Dict[str, Any]:
     """Вызов чат-комплишн у GigaChat."""
     token = await _fetch_token()
@@ -319,7 +422,7 @@ async def _call_gigachat(messages: List[Dict[str, str]], params: Dict[str, Any])
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
         "Accept": "application/json",
-        "RqUID": str(uuid.uuid4()),
+        "RqUID": _rquid(),
     }
     payload = {
         "model": GIGACHAT_MODEL,
@@ -335,16 +438,20 @@ async def _call_gigachat(messages: List[Dict[str, str]], params: Dict[str, Any])
         try:
             assert session is not None
             async with session.post(CHAT_URL, json=payload, headers=headers) as resp:
-                text = await resp.text()
                 if resp.status in (401, 403):
+                    # тело не нужно, но дочитываем его: иначе соединение закроется, а не вернётся в пул
+                    await _read_body(resp)
                     # токен мог протухнуть — обновим и повторим
+                    # (сбрасываем только свой токен: новый мог уже получить другой запрос)
                     global _token_value, _token_exp
-                    _token_value, _token_exp = None, 0.0
+                    if _token_value == token:
+                        _token_value, _token_exp = None, 0.0
                     token = await _fetch_token()
                     headers["Authorization"] = f"Bearer {token}"
                     continue
                 if resp.status == 200:
-                    return await resp.json()
+                    return orjson.loads(await _read_body(resp))
+                text = await _read_text(resp)
                 if resp.status in (408, 409, 429, 500, 502, 503, 504):
                     last_err = (resp.status, text)
                     await asyncio.sleep(0.7 * (2 ** attempt))
@@ -383,12 +490,14 @@ async def selftest():
         ok = bool(raw.get("choices"))
         return {"ok": ok, "provider": "gigachat", "model": GIGACHAT_MODEL}
     except HTTPException as e:
-        return JSONResponse(status_code=e.status_code, content={"ok": False, "detail": e.detail})
+        return ORJSONResponse(status_code=e.status_code, content={"ok": False, "detail": e.detail})
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat(req: ChatRequest):
     messages = _build_messages(req)
-    raw = await _call_gigachat(messages, req.dict())
+    # в GigaChat уходят только параметры генерации; явные null заменяются значениями по умолчанию
+    params = req.model_dump(include={"temperature", "top_p", "max_tokens"}, exclude_none=True)
+    raw = await _call_gigachat(messages, params)
     try:
         choices = raw.get("choices", [])
         if not choices:
@@ -400,4 +509,10 @@ async def chat(req: ChatRequest):
         raise HTTPException(status_code=502, detail=f"Unexpected GigaChat response format: {e} | raw={raw}")
     # постобработка: удалить HTML-теги и декодировать сущности/escape-последовательности
     cleaned = clean_html(content)
-    return JSONResponse(content=ChatResponse(reply=cleaned.strip(), model=GIGACHAT_MODEL, usage=usage).dict())
+    # ответ собираем dict-ом и сразу в orjson; ChatResponse описывает его для документации
+    return ORJSONResponse({
+        "reply": cleaned.strip(),
+        "model": GIGACHAT_MODEL,
+        "provider": "gigachat",
+        "usage": usage,
+    })